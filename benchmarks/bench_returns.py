@@ -0,0 +1,40 @@
+"""Benchmark log return: lambda per elemen (versi lama) vs investa.returns (vektor).
+
+Jalankan: python benchmarks/bench_returns.py [jumlah_baris]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from investa.returns import compute_returns
+
+
+def legacy_log_returns(prices):
+    return prices.pct_change().apply(lambda x: np.log(1 + x) if pd.notna(x) and x != -1 else np.nan)
+
+
+def best_time(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    prices = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows))))
+
+    legacy = best_time(legacy_log_returns, prices)
+    vectorized = best_time(compute_returns, prices)
+    print(f"{rows:,} baris")
+    print(f"lambda per elemen : {legacy:.4f} s")
+    print(f"vektor (np.log)   : {vectorized:.4f} s")
+    print(f"speedup           : {legacy / vectorized:.1f}x")
@@ -0,0 +1,274 @@
+"""Suite benchmark pipeline VaR dengan deteksi regresi terhadap baseline.
+
+Setiap kasus dijalankan pada data sintetis (tanpa jaringan; harga diambil lewat PriceStore
+in-memory dengan downloader palsu). Yang dicatat: waktu terbaik (wall time) dari beberapa
+pengulangan dan puncak memori (tracemalloc) dari satu pengulangan terpisah.
+
+    python benchmarks/run_benchmarks.py --save-baseline     # rekam baseline di mesin ini
+    python benchmarks/run_benchmarks.py                     # bandingkan; exit 1 bila ada regresi
+    python benchmarks/run_benchmarks.py --quick -k montecarlo
+
+Sebuah metrik dianggap regresi bila melebihi baseline lebih dari --time-threshold (waktu)
+atau --memory-threshold (memori), dalam fraksi. Baseline bergantung pada mesin, jadi rekam
+ulang setiap kali pindah mesin.
+"""
+import argparse
+import functools
+import hashlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from investa.compact import CompactReturns
+from investa.cornish_fisher import cornish_fisher_grid
+from investa.export import export_bytes
+from investa.intraday import resample_bars, stream_log_returns
+from investa.montecarlo import monte_carlo_risk
+from investa.pipeline import analyze_prices
+from investa.prices import PriceStore, wide_log_returns, wide_prices
+from investa.returns import compute_returns
+from investa.statistics import describe_returns, normality_screen, normality_test
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+HOLDING_PERIODS = [1, 5, 20, 250]
+ALPHAS = [0.01, 0.05, 0.10]
+# Batas bawah waktu/memori agar kasus yang sangat cepat/kecil tidak memicu alarm karena noise
+MIN_SECONDS = 0.005
+MIN_BYTES = 1 << 20
+
+BENCHMARKS = []
+
+
+def benchmark(name, repeat=3, slow=False, setup=None):
+    """Daftarkan fungsi tanpa argumen sebagai kasus benchmark.
+
+    `setup` (opsional) dipanggil sebelum pengukuran untuk menyiapkan data yang tidak ikut diukur.
+    """
+    def register(func):
+        BENCHMARKS.append({'name': name, 'func': func, 'repeat': repeat, 'slow': slow, 'setup': setup})
+        return func
+    return register
+
+
+def synthetic_prices(rows, seed=0, start='2000-01-03'):
+    """Harga GBM sintetis ber-index hari kerja (index bilangan bulat bila start=None)."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(start, periods=rows) if start is not None else None
+    return pd.Series(1000 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, rows))), index=index, name='Close')
+
+
+def stub_downloader(ticker, start, end):
+    """Downloader palsu: OHLCV sintetis yang deterministik per ticker."""
+    seed = int(hashlib.sha256(ticker.encode()).hexdigest()[:8], 16)
+    index = pd.bdate_range(start, end, inclusive='left')
+    close = synthetic_prices(len(index), seed=seed).to_numpy()
+    return pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+                         'Volume': np.full(len(index), 1e6)}, index=index)
+
+
+PRICES_1M = synthetic_prices(1_000_000, start=None)
+RETURNS_1M = compute_returns(PRICES_1M).dropna()
+RETURNS_10Y = RETURNS_1M.iloc[:2520]
+MOMENTS_10Y = describe_returns(RETURNS_10Y)
+
+
+@benchmark('returns.log_1e6')
+def bench_log_returns():
+    compute_returns(PRICES_1M)
+
+
+@benchmark('statistics.kstest_1e6')
+def bench_kstest():
+    normality_test(RETURNS_1M)
+
+
+@benchmark('statistics.shapiro_50')
+def bench_shapiro():
+    normality_test(RETURNS_10Y.iloc[:50])
+
+
+@benchmark('statistics.screen_60x10y')
+def bench_normality_screen():
+    rng = np.random.default_rng(0)
+    normality_screen(pd.DataFrame(rng.standard_t(5, (2520, 60)) * 0.01))
+
+
+def _minute_chunks(days=250, seed=0):
+    """Bar 1 menit sintetis (390 bar per hari kerja) dalam potongan bulanan."""
+    prices = synthetic_prices(days * 390, seed=seed, start=None).to_numpy()
+    index = pd.bdate_range('2024-01-02', periods=days).repeat(390) + pd.to_timedelta(np.tile(np.arange(390), days), 'min')
+    bars = pd.DataFrame({'Open': prices, 'High': prices, 'Low': prices, 'Close': prices, 'Volume': 1.0}, index=index)
+    for _, chunk in bars.groupby(bars.index.to_period('M')):
+        yield chunk
+
+
+@benchmark('intraday.resample_1m_to_1d_1y', repeat=1)
+def bench_intraday_resample():
+    for _ in stream_log_returns(resample_bars(_minute_chunks(), '1D')):
+        pass
+
+
+@benchmark('compact.returns_1e6')
+def bench_compact_returns():
+    CompactReturns.from_series(RETURNS_1M)
+
+
+def _monte_carlo_case(iterations, sampler):
+    def run():
+        monte_carlo_risk(MOMENTS_10Y['mean'], MOMENTS_10Y['std'], ALPHAS, HOLDING_PERIODS, iterations,
+                         seed=0, sampler=sampler)
+    return run
+
+
+for _power in range(3, 8):
+    # Jalur harian penuh untuk hp 250 pada 1e7 iterasi terlalu lama untuk suite rutin
+    for _sampler in ('paths', 'collapsed'):
+        if _sampler == 'paths' and _power > 6:
+            continue
+        benchmark(f'montecarlo.{_sampler}_1e{_power}', repeat=1 if _power >= 6 else 3,
+                  slow=_power >= 6)(_monte_carlo_case(10 ** _power, _sampler))
+
+
+@benchmark('montecarlo.qmc_1e6', repeat=1, slow=True)
+def bench_qmc():
+    monte_carlo_risk(MOMENTS_10Y['mean'], MOMENTS_10Y['std'], ALPHAS, HOLDING_PERIODS, 10 ** 6,
+                     seed=0, sampler='qmc')
+
+
+@benchmark('cornish_fisher.grid_1000x7x4')
+def bench_cornish_fisher_grid():
+    rng = np.random.default_rng(0)
+    cornish_fisher_grid(rng.normal(0, 0.001, 1000), rng.uniform(0.01, 0.03, 1000), rng.normal(0, 0.5, 1000),
+                        rng.uniform(0, 5, 1000), [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.10],
+                        HOLDING_PERIODS)
+
+
+@benchmark('prices.get_many_50x10y')
+def bench_price_store():
+    store = PriceStore(':memory:', downloader=stub_downloader)
+    tickers = [f'T{i:03d}' for i in range(50)]
+    wide_log_returns(wide_prices(store.get_many(tickers, '2014-01-01', '2024-01-01')))
+
+
+@benchmark('pipeline.analyze_prices_10y')
+def bench_pipeline():
+    analyze_prices(synthetic_prices(2521), iterations=10000, seed=0)
+
+
+@benchmark('export.excel_results', repeat=3)
+def bench_excel_results():
+    rows = [{'Confidence Level': f"{int((1 - a) * 100)}%", 'Holding Period': f"{hp} hari",
+             'VaR Value': -0.01 * hp, 'Kerugian Maksimal (Rp)': 1e6 * hp}
+            for a in np.linspace(0.001, 0.1, 50) for hp in range(1, 251)]
+    export_bytes({'VaR Results': pd.DataFrame(rows)}, 'xlsx')
+
+
+@functools.cache
+def wide_50x10y():
+    """Harga wide 50 ticker x 10 tahun; dibangun sekali saat kasus export wide pertama dijalankan."""
+    return wide_prices(PriceStore(':memory:', downloader=stub_downloader).get_many(
+        [f'T{i:03d}' for i in range(50)], '2014-01-01', '2024-01-01'))
+
+
+def _wide_export_case(fmt):
+    def run():
+        wide = wide_50x10y()
+        export_bytes({'Close': wide.reset_index(), 'Log Return': wide_log_returns(wide).reset_index()}, fmt)
+    return run
+
+
+for _fmt in ('xlsx', 'parquet', 'csv'):
+    benchmark(f'export.{_fmt}_wide_50x10y', repeat=1 if _fmt == 'xlsx' else 3,
+              slow=_fmt == 'xlsx', setup=wide_50x10y)(_wide_export_case(_fmt))
+
+
+def measure(case):
+    """Jalankan satu kasus; kembalikan {'seconds', 'peak_bytes'}."""
+    if case['setup'] is not None:
+        case['setup']()
+    tracemalloc.start()
+    case['func']()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = float('inf')
+    for _ in range(case['repeat']):
+        start = time.perf_counter()
+        case['func']()
+        best = min(best, time.perf_counter() - start)
+    return {'seconds': best, 'peak_bytes': peak}
+
+
+def find_regressions(results, baseline, time_threshold, memory_threshold):
+    """Bandingkan hasil dengan baseline; kembalikan daftar (nama, metrik, baseline, sekarang)."""
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        if metrics['seconds'] > max(base['seconds'], MIN_SECONDS) * (1 + time_threshold):
+            regressions.append((name, 'seconds', base['seconds'], metrics['seconds']))
+        if metrics['peak_bytes'] > max(base['peak_bytes'], MIN_BYTES) * (1 + memory_threshold):
+            regressions.append((name, 'peak_bytes', base['peak_bytes'], metrics['peak_bytes']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-k', '--filter', default='', help="Jalankan hanya kasus yang namanya memuat teks ini")
+    parser.add_argument('--quick', action='store_true', help="Lewati kasus besar (>= 1e6 iterasi, export lebar)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="Tulis hasil sebagai baseline baru")
+    parser.add_argument('--time-threshold', type=float, default=0.25)
+    parser.add_argument('--memory-threshold', type=float, default=0.10)
+    parser.add_argument('--output', help="Simpan hasil mentah ke file JSON")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in BENCHMARKS
+             if args.filter in case['name'] and not (args.quick and case['slow'])]
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    print(f"{'benchmark':<32} {'waktu (s)':>10} {'memori (MB)':>12} {'vs baseline':>12}")
+    for case in cases:
+        metrics = measure(case)
+        results[case['name']] = metrics
+        base = baseline.get(case['name'])
+        ratio = f"{metrics['seconds'] / base['seconds']:.2f}x" if base else '-'
+        print(f"{case['name']:<32} {metrics['seconds']:>10.4f} {metrics['peak_bytes'] / 2**20:>12.1f} {ratio:>12}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        # Gabungkan dengan baseline lama agar menjalankan sebagian kasus tidak menghapus yang lain
+        merged = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                merged = json.load(f)
+        merged.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(merged, f, indent=2, sort_keys=True)
+        print(f"Baseline ditulis ke {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"Baseline {args.baseline} belum ada; jalankan dengan --save-baseline terlebih dahulu")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.time_threshold, args.memory_threshold)
+    for name, metric, base, current in regressions:
+        print(f"REGRESI {name}: {metric} {base:.4g} -> {current:.4g} ({current / base:.2f}x)")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Mesin perhitungan risiko INVESTA yang dapat diimpor tanpa Streamlit."""
@@ -0,0 +1,5 @@
+import sys
+
+from investa.cli import main
+
+sys.exit(main())
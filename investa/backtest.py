@@ -0,0 +1,118 @@
+"""Backtesting VaR dengan rolling window serta uji Kupiec (POF) dan Christoffersen."""
+import numpy as np
+import pandas as pd
+from scipy import stats
+from scipy.special import xlogy
+
+from investa.cornish_fisher import cornish_fisher_z
+
+BACKTEST_METHODS = ('cornish_fisher', 'monte_carlo')
+
+
+def rolling_moments(returns, window):
+    """Mean, std (ddof=1), skewness dan excess kurtosis (bias seperti stats.skew/stats.kurtosis)
+    untuk setiap window yang berakhir di indeks t, dari prefix sum pangkat 1-4 (O(1) per window).
+
+    Mengembalikan dict array sepanjang len(returns) - window + 1.
+    """
+    x = np.asarray(returns, dtype=float)
+    # Geser ke rata-rata global agar penjumlahan pangkat tinggi tidak kehilangan presisi
+    x = x - x.mean()
+    sums = [np.concatenate(([0.0], np.cumsum(x**p))) for p in range(1, 5)]
+    s1, s2, s3, s4 = [(s[window:] - s[:-window]) / window for s in sums]
+
+    m2 = s2 - s1**2
+    m3 = s3 - 3*s1*s2 + 2*s1**3
+    m4 = s4 - 4*s1*s3 + 6*s1**2*s2 - 3*s1**4
+    with np.errstate(divide='ignore', invalid='ignore'):
+        skew = m3 / m2**1.5
+        kurt = m4 / m2**2 - 3
+    return {
+        'mean': s1 + np.mean(returns),
+        'std': np.sqrt(np.maximum(m2, 0) * window / (window - 1)),
+        'skew': skew,
+        'kurtosis': kurt,
+    }
+
+
+def rolling_var(returns, window, alpha, method='cornish_fisher', iterations=100000, seed=None):
+    """VaR 1 hari untuk setiap window sekaligus (vektor).
+
+    'cornish_fisher' memakai quantile CF dari momen rolling. 'monte_carlo' memakai simulasi
+    Normal dengan common random numbers: quantile dari satu set draw standar dipakai untuk
+    semua window, sehingga VaR = mean + std x quantile simulasi.
+    """
+    moments = rolling_moments(returns, window)
+    if method == 'cornish_fisher':
+        z = cornish_fisher_z(stats.norm.ppf(alpha), moments['skew'], moments['kurtosis'])
+    elif method == 'monte_carlo':
+        draws = np.random.default_rng(seed).standard_normal(iterations)
+        z = np.partition(draws, int(alpha * iterations))[int(alpha * iterations)]
+    else:
+        raise ValueError(f"Metode backtest tidak dikenal: {method}")
+    return moments['mean'] + z * moments['std']
+
+
+def kupiec_pof(exceedances, alpha):
+    """Uji proportion of failures Kupiec; mengembalikan (statistik LR, p-value)."""
+    n = len(exceedances)
+    x = int(np.sum(exceedances))
+    observed = x / n
+    lr = -2 * (xlogy(n - x, 1 - alpha) + xlogy(x, alpha)
+               - xlogy(n - x, 1 - observed) - xlogy(x, observed))
+    return lr, stats.chi2.sf(lr, 1)
+
+
+def christoffersen_independence(exceedances):
+    """Uji independensi Christoffersen (rantai Markov orde 1); mengembalikan (statistik LR, p-value)."""
+    hits = np.asarray(exceedances, dtype=int)
+    prev, curr = hits[:-1], hits[1:]
+    n00 = np.sum((prev == 0) & (curr == 0))
+    n01 = np.sum((prev == 0) & (curr == 1))
+    n10 = np.sum((prev == 1) & (curr == 0))
+    n11 = np.sum((prev == 1) & (curr == 1))
+    pi0 = n01 / max(n00 + n01, 1)
+    pi1 = n11 / max(n10 + n11, 1)
+    pi = (n01 + n11) / max(n00 + n01 + n10 + n11, 1)
+    lr = -2 * (xlogy(n00 + n10, 1 - pi) + xlogy(n01 + n11, pi)
+               - xlogy(n00, 1 - pi0) - xlogy(n01, pi0) - xlogy(n10, 1 - pi1) - xlogy(n11, pi1))
+    return lr, stats.chi2.sf(lr, 1)
+
+
+def backtest_var(log_returns, alphas=(0.01, 0.05, 0.10), window=250, method='cornish_fisher',
+                 iterations=100000, seed=None):
+    """Backtest VaR 1 hari: VaR dari window [t-window, t) dibandingkan return realisasi hari t.
+
+    Mengembalikan (DataFrame harian berisi return realisasi, VaR dan exceedance per alpha,
+    DataFrame ringkasan uji per alpha).
+    """
+    log_returns = log_returns.dropna()
+    if len(log_returns) <= window:
+        raise ValueError(f"Data log return harus lebih panjang dari window ({window})")
+    values = log_returns.to_numpy(dtype=float)
+    realized = values[window:]
+
+    daily = pd.DataFrame({'Return': realized}, index=log_returns.index[window:])
+    summary = []
+    for alpha in alphas:
+        # Window terakhir tidak punya hari realisasi berikutnya
+        var = rolling_var(values, window, alpha, method, iterations, seed)[:-1]
+        hits = realized < var
+        label = f"{int((1-alpha)*100)}%"
+        daily[f'VaR {label}'] = var
+        daily[f'Exceed {label}'] = hits
+
+        pof_lr, pof_p = kupiec_pof(hits, alpha)
+        ind_lr, ind_p = christoffersen_independence(hits)
+        summary.append({
+            'Confidence Level': label,
+            'Jumlah Hari': len(hits),
+            'Exceedance': int(hits.sum()),
+            'Exceedance Diharapkan': alpha * len(hits),
+            'Kupiec LR': pof_lr,
+            'Kupiec p-value': pof_p,
+            'Christoffersen LR': ind_lr,
+            'Christoffersen p-value': ind_p,
+            'Conditional Coverage p-value': stats.chi2.sf(pof_lr + ind_lr, 2),
+        })
+    return daily, pd.DataFrame(summary)
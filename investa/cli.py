@@ -0,0 +1,130 @@
+"""Command line untuk perhitungan VaR massal tanpa Streamlit.
+
+Contoh:
+    python -m investa --preset idn --output var_idn.xlsx
+    python -m investa --input-dir data/ --output var.parquet --workers 8
+    python -m investa --tickers BBCA.JK --interval 5m --resample 1D --output var_5m.csv
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import pandas as pd
+
+from investa.export import EXPORT_FORMATS, write_export
+from investa.intraday import INTERVALS
+from investa.loaders import UPLOAD_TYPES, load_price_file
+from investa.montecarlo import SAMPLERS
+from investa.pipeline import PRESET_ALPHAS, PRESET_HOLDING_PERIODS, analyze_prices
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='investa', description="Hitung VaR untuk banyak saham sekaligus")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--tickers', nargs='+', help="Ticker Yahoo Finance, mis. BBCA.JK AAPL")
+    source.add_argument('--preset', choices=['idn', 'intl'], help="Seluruh daftar preset saham")
+    source.add_argument('--input-dir', help="Folder berisi file Excel/CSV/Parquet data saham")
+    parser.add_argument('--start', default=str(date.today() - timedelta(days=365)), help="Tanggal mulai (YYYY-MM-DD)")
+    parser.add_argument('--end', default=str(date.today()), help="Tanggal akhir (YYYY-MM-DD)")
+    parser.add_argument('--interval', choices=['1d', *INTERVALS], default='1d',
+                        help="Interval bar untuk --tickers/--preset (intraday: 1m-1h)")
+    parser.add_argument('--resample', default='1D',
+                        help="Horizon resample bar intraday (mis. 1D, 1h, 15min) atau 'none' untuk per bar")
+    parser.add_argument('--output', required=True, help="File hasil: .csv, .parquet, atau .xlsx")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--alphas', type=float, nargs='+', default=PRESET_ALPHAS)
+    parser.add_argument('--holding-periods', type=int, nargs='+', default=PRESET_HOLDING_PERIODS)
+    parser.add_argument('--alpha-test', type=float, default=0.05, help="Taraf signifikansi uji normalitas")
+    parser.add_argument('--iterations', type=int, default=10000)
+    parser.add_argument('--sampler', choices=SAMPLERS, default='paths')
+    parser.add_argument('--seed', type=int, default=None, help="Seed utama; tiap saham memakai [seed, urutan]")
+    parser.add_argument('--v0', type=float, default=100000000, help="Nilai investasi awal")
+    parser.add_argument('--cache', default=None, help="Lokasi file cache harga (SQLite)")
+    return parser
+
+
+def _analyze_job(name, source, kwargs):
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            df, close_col = load_price_file(f, source)
+        if close_col is None:
+            raise ValueError("kolom harga penutupan tidak ditemukan")
+        source = df[close_col]
+    if source.dropna().empty:
+        # Unduhan gagal (get_many/intraday mengembalikan frame kosong) atau ticker tanpa data
+        raise ValueError("tidak ada data harga")
+    summary, table = analyze_prices(source, **kwargs)
+    table.insert(0, 'Ticker', name)
+    for key in ('test_name', 'p_value', 'count', 'mean', 'std', 'skew', 'kurtosis'):
+        table[key] = summary[key]
+    return table
+
+
+def collect_jobs(args):
+    if args.input_dir:
+        names = sorted(name for name in os.listdir(args.input_dir)
+                       if os.path.splitext(name)[1].lower().lstrip('.') in UPLOAD_TYPES)
+        stems = [os.path.splitext(name)[0] for name in names]
+        # Stem ganda (mis. A.csv dan A.parquet) memakai nama file lengkap agar hasilnya tidak tertukar
+        return [(stem if stems.count(stem) == 1 else name, os.path.join(args.input_dir, name))
+                for stem, name in zip(stems, names)]
+
+    from investa.prices import DEFAULT_CACHE_PATH, DownloadError, PriceStore
+    from investa.presets import preset_tickers
+
+    tickers = args.tickers or preset_tickers(args.preset)
+    if args.interval != '1d':
+        from investa.intraday import IntradayStore, load_bars
+
+        store = IntradayStore(os.path.join(os.path.dirname(args.cache), 'intraday')) if args.cache else IntradayStore()
+        rule = None if args.resample.lower() == 'none' else args.resample
+        jobs = []
+        for ticker in tickers:
+            try:
+                data = load_bars(store, ticker, args.start, args.end, args.interval, rule)
+            except DownloadError as e:
+                # Sama seperti PriceStore.get_many: ticker gagal menjadi kosong dan dilaporkan gagal di main
+                print(f"Gagal mengunduh {ticker}: {e}", file=sys.stderr)
+                data = pd.DataFrame(columns=['Close'], dtype=float)
+            jobs.append((ticker, data['Close']))
+        return jobs
+    store = PriceStore(args.cache or DEFAULT_CACHE_PATH)
+    frames = store.get_many(tickers, args.start, args.end)
+    return [(ticker, data['Close']) for ticker, data in frames.items()]
+
+
+def write_results(results, path):
+    write_export({'VaR Results': results}, path)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # Format output diperiksa sebelum data diunduh dan dihitung
+    if args.output.rsplit('.', 1)[-1].lower() not in EXPORT_FORMATS:
+        parser.error(f"--output harus berekstensi {', '.join('.' + fmt for fmt in EXPORT_FORMATS)}")
+    jobs = collect_jobs(args)
+    base_kwargs = dict(alphas=args.alphas, holding_periods=args.holding_periods, alpha_test=args.alpha_test,
+                       v0=args.v0, iterations=args.iterations, sampler=args.sampler)
+
+    tables, failed = [], []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = []
+        for index, (name, source) in enumerate(jobs):
+            kwargs = dict(base_kwargs, seed=None if args.seed is None else [args.seed, index])
+            futures.append((name, pool.submit(_analyze_job, name, source, kwargs)))
+        for name, future in futures:
+            try:
+                tables.append(future.result())
+            except Exception as e:
+                failed.append(name)
+                print(f"Gagal menghitung {name}: {e}", file=sys.stderr)
+
+    if not tables:
+        print("Tidak ada hasil yang dapat ditulis", file=sys.stderr)
+        return 1
+    write_results(pd.concat(tables, ignore_index=True), args.output)
+    print(f"{len(tables)} saham dihitung, hasil ditulis ke {args.output}")
+    return 1 if failed else 0
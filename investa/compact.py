@@ -0,0 +1,108 @@
+"""Representasi ringkas log return dan tabel harga untuk disimpan di session state.
+
+Per sesi, DataFrame upload lengkap plus Series log return (float64, index pandas, kolom object)
+bisa memakan beberapa kali ukuran datanya sendiri. CompactReturns menyimpan log return sebagai
+array NumPy kontigu (float32 bila presisinya cukup), tanggal sebagai datetime64[s], dan momen
+yang sudah dihitung dari data float64 asli sehingga statistik tidak terpengaruh pembulatan.
+Perhitungan risiko tetap berjalan di float64: modul model, backtest, historis, dan portofolio
+mengonversi input dengan np.asarray(..., dtype=float) / to_numpy(dtype=float).
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from investa.statistics import describe_returns
+
+# Galat pembulatan float32 maksimum yang diterima, relatif terhadap standar deviasi data
+FLOAT32_TOLERANCE = 1e-6
+
+# Anggaran memori data per sesi (MB); bisa diubah lewat env INVESTA_SESSION_BUDGET_MB
+SESSION_MEMORY_BUDGET = float(os.environ.get('INVESTA_SESSION_BUDGET_MB', 8)) * 2**20
+
+
+def fits_float32(values, tolerance=FLOAT32_TOLERANCE):
+    """True bila values bisa disimpan sebagai float32 tanpa galat melebihi tolerance x std."""
+    values = np.asarray(values, dtype=float)
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return True
+    if np.abs(finite).max() > np.finfo(np.float32).max:
+        return False
+    error = np.abs(finite - finite.astype(np.float32)).max()
+    scale = finite.std() or np.abs(finite).max() or 1.0
+    return error <= tolerance * scale
+
+
+class CompactReturns:
+    """Log return sebagai array kontigu + tanggal opsional + momen (dict describe_returns)."""
+
+    __slots__ = ('values', 'dates', 'stats')
+
+    def __init__(self, values, dates=None, stats=None):
+        self.values = np.ascontiguousarray(values)
+        self.dates = None if dates is None else np.ascontiguousarray(dates, dtype='datetime64[s]')
+        self.stats = stats
+
+    @classmethod
+    def from_series(cls, log_returns, dates=None, float32=None):
+        """Bangun dari Series log return (NaN dibuang); dates sejajar dengan log_returns bila diisi.
+
+        float32=None memilih float32 otomatis bila fits_float32; True/False memaksa pilihan.
+        Tanggal diambil dari `dates`, atau dari index bila berupa DatetimeIndex.
+        """
+        log_returns = pd.Series(log_returns)
+        mask = log_returns.notna().to_numpy()
+        values = log_returns.to_numpy(dtype=float)[mask]
+        if dates is None and isinstance(log_returns.index, pd.DatetimeIndex):
+            dates = log_returns.index
+        if dates is not None:
+            dates = pd.DatetimeIndex(pd.to_datetime(np.asarray(dates), errors='coerce'))[mask]
+            if dates.hasnans:
+                dates = None
+        stats = {key: float(value) for key, value in describe_returns(pd.Series(values)).items()}
+        if float32 is None:
+            float32 = fits_float32(values)
+        return cls(values.astype(np.float32 if float32 else np.float64), dates, stats)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + (0 if self.dates is None else self.dates.nbytes)
+
+    def series(self):
+        """Series tanpa menyalin data (index tanggal bila tersedia) untuk kode yang butuh pandas."""
+        index = None if self.dates is None else pd.DatetimeIndex(self.dates)
+        return pd.Series(self.values, index=index, copy=False, name='Log Return')
+
+
+def compact_frame(df, tolerance=FLOAT32_TOLERANCE):
+    """Salinan df dengan kolom float64 diturunkan ke float32 bila fits_float32 (kolom lain tetap)."""
+    dtypes = {col: np.float32 for col in df.columns
+              if df[col].dtype == np.float64 and fits_float32(df[col].to_numpy(), tolerance)}
+    return df.astype(dtypes) if dtypes else df
+
+
+def nbytes(value):
+    """Perkiraan ukuran satu nilai session state dalam byte (termasuk isi kolom object)."""
+    if isinstance(value, CompactReturns):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(nbytes(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+def session_memory(state, keys=None):
+    """Ukuran (byte) per kunci session state, diurutkan dari yang terbesar."""
+    keys = list(state.keys()) if keys is None else [key for key in keys if key in state]
+    sizes = {key: nbytes(state[key]) for key in keys}
+    return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
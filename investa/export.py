@@ -0,0 +1,111 @@
+"""Ekspor tabel ke Excel (streaming), Parquet, atau CSV tanpa membangun workbook utuh di memori.
+
+`sheets` selalu berupa dict nama sheet -> DataFrame (index tidak ikut ditulis; reset_index()
+dulu bila index perlu disimpan). Excel ditulis baris demi baris lewat xlsxwriter mode
+constant_memory, atau openpyxl mode write-only bila xlsxwriter tidak terpasang. Parquet dan CSV
+hanya menyimpan satu tabel per file, jadi banyak sheet dikemas sebagai arsip zip.
+"""
+import io
+import re
+import zipfile
+
+EXPORT_FORMATS = {
+    'xlsx': ('Excel', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet'),
+    'csv': ('CSV', 'text/csv'),
+}
+
+DATE_FORMAT = 'yyyy-mm-dd'
+
+# Jumlah baris per blok saat mengubah DataFrame menjadi nilai Python untuk Excel
+ROW_BLOCK = 10000
+
+
+def _rows(df, block=ROW_BLOCK):
+    """Baris DataFrame sebagai tuple Python; NaN/NaT menjadi None (sel kosong).
+
+    Salinan object dibuat per blok `block` baris, bukan untuk seluruh sheet sekaligus.
+    """
+    for start in range(0, len(df), block):
+        part = df.iloc[start:start + block]
+        yield from part.astype(object).where(part.notna(), None).itertuples(index=False, name=None)
+
+
+def write_excel(sheets, target):
+    """Tulis sheets ke file/BytesIO xlsx secara streaming, baris demi baris."""
+    try:
+        import xlsxwriter
+    except ImportError:
+        return _write_excel_openpyxl(sheets, target)
+
+    workbook = xlsxwriter.Workbook(target, {'constant_memory': True, 'default_date_format': DATE_FORMAT,
+                                            'nan_inf_to_errors': True})
+    try:
+        for name, df in sheets.items():
+            worksheet = workbook.add_worksheet(name)
+            worksheet.write_row(0, 0, [str(col) for col in df.columns])
+            for row, values in enumerate(_rows(df), start=1):
+                worksheet.write_row(row, 0, values)
+    finally:
+        workbook.close()
+
+
+def _write_excel_openpyxl(sheets, target):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for name, df in sheets.items():
+        worksheet = workbook.create_sheet(name)
+        worksheet.append([str(col) for col in df.columns])
+        for values in _rows(df):
+            worksheet.append(values)
+    workbook.save(target)
+
+
+def _write_table(df, fmt, target):
+    if fmt == 'parquet':
+        df.rename(columns=str).to_parquet(target, index=False)
+    elif fmt == 'csv':
+        df.to_csv(target, index=False)
+    else:
+        raise ValueError(f"Format ekspor tidak didukung: {fmt}")
+
+
+def export_bytes(sheets, fmt):
+    """Isi file ekspor dalam format `fmt` (kunci EXPORT_FORMATS) sebagai bytes."""
+    output = io.BytesIO()
+    if fmt == 'xlsx':
+        write_excel(sheets, output)
+    elif len(sheets) == 1:
+        _write_table(next(iter(sheets.values())), fmt, output)
+    else:
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, df in sheets.items():
+                table = io.BytesIO()
+                _write_table(df, fmt, table)
+                archive.writestr(f"{_safe_name(name)}.{fmt}", table.getvalue())
+    return output.getvalue()
+
+
+def export_target(basename, fmt, sheet_count=1):
+    """(nama file, MIME type) hasil export_bytes untuk format dan jumlah sheet tertentu."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format ekspor tidak didukung: {fmt}")
+    if fmt != 'xlsx' and sheet_count > 1:
+        return f"{basename}_{fmt}.zip", 'application/zip'
+    return f"{basename}.{fmt}", EXPORT_FORMATS[fmt][1]
+
+
+def write_export(sheets, path):
+    """Tulis sheets ke path; format diambil dari ekstensi file (.xlsx, .parquet, .csv)."""
+    fmt = path.rsplit('.', 1)[-1].lower()
+    if fmt == 'xlsx':
+        write_excel(sheets, path)
+    elif fmt in EXPORT_FORMATS and len(sheets) == 1:
+        _write_table(next(iter(sheets.values())), fmt, path)
+    else:
+        raise ValueError(f"Format output tidak didukung: .{fmt}")
+
+
+def _safe_name(name):
+    return re.sub(r'[^\w.-]+', '_', name).strip('_') or 'sheet'
@@ -0,0 +1,163 @@
+"""VaR historis, jendela terburuk, dan skenario stres dari indeks prefix sum log return.
+
+Return kumulatif h hari untuk semua jendela adalah selisih prefix sum, S[t + h] - S[t], sehingga
+satu holding period cukup O(n) dan tidak perlu menjumlahkan ulang setiap jendela. Untuk setiap
+holding period yang pernah diminta, ekor terkecil (posisi jendela yang sudah diurutkan) disimpan
+sehingga VaR historis dan jendela terburuk berikutnya untuk holding period itu langsung tersedia.
+"""
+import numpy as np
+import pandas as pd
+
+from investa.montecarlo import var_order_index
+
+# Skenario krisis bernama: (tanggal mulai, tanggal akhir) inklusif
+STRESS_SCENARIOS = {
+    'Krisis Keuangan Global (Sep-Nov 2008)': ('2008-09-01', '2008-11-20'),
+    'Krisis Utang Eropa (Agu 2011)': ('2011-07-22', '2011-08-19'),
+    'Taper Tantrum (Mei-Jun 2013)': ('2013-05-22', '2013-06-24'),
+    'Devaluasi Yuan (Agu 2015)': ('2015-08-10', '2015-08-25'),
+    'COVID-19 (Mar 2020)': ('2020-02-20', '2020-03-23'),
+    'Kenaikan Suku Bunga (2022)': ('2022-01-03', '2022-06-16'),
+}
+
+# Fraksi jendela terkecil yang disimpan terurut per holding period
+TAIL_FRACTION = 0.10
+
+
+class HistoricalIndex:
+    """Indeks prefix sum log return satu saham.
+
+    `log_returns` adalah Series (index tanggal bila ada) atau array; NaN dibuang.
+    Return kumulatif per holding period dan ekornya dihitung saat pertama diminta lalu disimpan.
+    """
+
+    def __init__(self, log_returns, tail_fraction=TAIL_FRACTION):
+        log_returns = pd.Series(log_returns).dropna()
+        self.dates = log_returns.index if isinstance(log_returns.index, pd.DatetimeIndex) else None
+        self.prefix = np.concatenate([[0.0], np.cumsum(log_returns.to_numpy(dtype=float))])
+        self.tail_fraction = tail_fraction
+        self._windows = {}
+        self._tails = {}
+
+    def __len__(self):
+        return len(self.prefix) - 1
+
+    def window_returns(self, holding_period):
+        """Return kumulatif semua jendela h hari; elemen ke-t mencakup return t .. t + h - 1."""
+        if holding_period < 1:
+            raise ValueError("Holding period minimal 1 hari")
+        if holding_period not in self._windows:
+            self._windows[holding_period] = self.prefix[holding_period:] - self.prefix[:-holding_period]
+        return self._windows[holding_period]
+
+    def _tail(self, holding_period, size):
+        """Posisi `size` jendela terkecil, terurut naik."""
+        windows = self.window_returns(holding_period)
+        cached = self._tails.get(holding_period)
+        if cached is None or len(cached) < min(size, len(windows)):
+            size = min(len(windows), max(size, int(self.tail_fraction * len(windows)) + 1))
+            positions = np.argpartition(windows, size - 1)[:size] if size < len(windows) else np.arange(len(windows))
+            cached = positions[np.argsort(windows[positions], kind='stable')]
+            self._tails[holding_period] = cached
+        return cached
+
+    def historical_var(self, alphas, holding_periods):
+        """VaR historis (quantile return kumulatif jendela h hari yang saling tumpang tindih).
+
+        Order statistic yang dipakai sama dengan Monte Carlo (var_order_index). Mengembalikan
+        array (len(alphas), len(holding_periods)); NaN bila data lebih pendek dari holding period.
+        """
+        var = np.full((len(alphas), len(holding_periods)), np.nan)
+        for j, hp in enumerate(holding_periods):
+            if hp > len(self):
+                continue
+            n = len(self.window_returns(hp))
+            indices = [var_order_index(alpha, n) for alpha in alphas]
+            tail = self._tail(hp, max(indices) + 1)
+            var[:, j] = self.window_returns(hp)[tail[indices]]
+        return var
+
+    def worst_windows(self, holding_period, count=10, overlap=False):
+        """Jendela h hari terburuk, diurutkan dari kerugian terbesar.
+
+        Dengan overlap=False, jendela yang tumpang tindih dengan jendela yang lebih buruk dilewati
+        sehingga satu episode krisis tidak mengisi seluruh daftar.
+        """
+        if not isinstance(holding_period, (int, np.integer)) or holding_period < 1:
+            raise ValueError("Holding period minimal 1 hari")
+        if count < 1:
+            raise ValueError("Jumlah jendela minimal 1")
+        if holding_period > len(self):
+            return self._frame([], holding_period)
+        windows = self.window_returns(holding_period)
+        size = count if overlap else count * holding_period
+        while True:
+            tail = self._tail(holding_period, size)
+            chosen = []
+            for position in tail:
+                if overlap or all(abs(position - other) >= holding_period for other in chosen):
+                    chosen.append(position)
+                    if len(chosen) == count:
+                        break
+            if len(chosen) == count or len(tail) == len(windows):
+                return self._frame(chosen, holding_period)
+            size = 2 * len(tail)
+
+    def scenario(self, start, end):
+        """Return kumulatif dan hari terburuk dalam rentang tanggal [start, end]; None bila di luar data.
+
+        'Cakupan Penuh' bernilai False bila data berawal setelah `start` atau berakhir sebelum `end`;
+        return kumulatifnya hanya mencakup potongan jendela sehingga kerugian skenario bisa lebih kecil.
+        """
+        if self.dates is None:
+            raise ValueError("Skenario stres membutuhkan log return ber-index tanggal")
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        first = self.dates.searchsorted(start, side='left')
+        last = self.dates.searchsorted(end, side='right')
+        if last <= first:
+            return None
+        daily = np.diff(self.prefix[first:last + 1])
+        # Tercakup penuh bila ada data di (atau sebelum/sesudah) kedua ujung jendela
+        covered = (first > 0 or self.dates[0] <= start) and (last < len(self.dates) or self.dates[-1] >= end)
+        return {
+            'Mulai Diminta': start,
+            'Akhir Diminta': end,
+            'Mulai': self.dates[first],
+            'Akhir': self.dates[last - 1],
+            'Cakupan Penuh': bool(covered),
+            'Jumlah Hari': last - first,
+            'Return Kumulatif': self.prefix[last] - self.prefix[first],
+            'Return Harian Terburuk': daily.min(),
+        }
+
+    def stress_table(self, v0, scenarios=STRESS_SCENARIOS):
+        """Perubahan nilai posisi v0 pada skenario krisis bernama (hanya skenario yang tercakup data).
+
+        Skenario yang hanya tercakup sebagian tetap disertakan dengan 'Cakupan Penuh' = False.
+        Sama seperti VaR di aplikasi, nominal dihitung sebagai return log x v0.
+        """
+        rows = []
+        for name, (start, end) in scenarios.items():
+            result = self.scenario(start, end)
+            if result is not None:
+                rows.append({'Skenario': name, **result,
+                             'Perubahan Nilai (Rp)': v0 * result['Return Kumulatif']})
+        return pd.DataFrame(rows)
+
+    def _frame(self, positions, holding_period):
+        positions = np.asarray(positions, dtype=int)
+        frame = pd.DataFrame({
+            'Peringkat': np.arange(1, len(positions) + 1),
+            'Return Kumulatif': self.window_returns(holding_period)[positions] if len(positions) else [],
+        })
+        if self.dates is not None:
+            frame.insert(1, 'Mulai', self.dates[positions])
+            frame.insert(2, 'Akhir', self.dates[positions + holding_period - 1])
+        else:
+            frame.insert(1, 'Hari ke-', positions + 1)
+        return frame
+
+
+def build_historical_indexes(wide_returns, tail_fraction=TAIL_FRACTION):
+    """Indeks per ticker dari frame log return lebar (kolom = ticker)."""
+    return {ticker: HistoricalIndex(wide_returns[ticker], tail_fraction) for ticker in wide_returns.columns}
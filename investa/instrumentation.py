@@ -0,0 +1,150 @@
+"""Pencatat waktu per tahap (timer), cProfile opsional, dan puncak memori untuk jalur lambat aplikasi.
+
+Puncak memori diukur dengan tracemalloc yang berlaku untuk seluruh proses, jadi pada server
+dengan banyak sesi bersamaan nilainya adalah perkiraan.
+
+Setiap tahap yang selesai menghasilkan satu record dict dan dikirim sebagai log JSON satu baris
+ke logger 'investa.perf', sehingga bisa diteruskan ke sistem metrik mana pun lewat handler logging.
+Saat dinonaktifkan, stage() mengembalikan context manager kosong yang sama sehingga overhead-nya
+hampir nol.
+"""
+import cProfile
+import io
+import json
+import logging
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+logger = logging.getLogger('investa.perf')
+
+_DISABLED = nullcontext()
+
+# Jumlah fungsi teratas (berdasarkan waktu kumulatif) yang disimpan dari hasil cProfile
+PROFILE_LIMIT = 25
+
+
+class PerfRecorder:
+    """Kumpulkan durasi tiap tahap; opsional cProfile (per tahap terluar) dan puncak memori (tracemalloc).
+
+    Pemakaian:
+
+        perf = PerfRecorder(enabled=True, memory=True)
+        with perf.stage('download', ticker='BBCA.JK'):
+            ...
+
+    `records` berisi dict per tahap sesuai urutan mulai (tahap luar sebelum tahap dalamnya):
+    stage, depth, seconds, serta peak_bytes (bila memory=True) dan field tambahan dari stage().
+    """
+
+    def __init__(self, enabled=False, profile=False, memory=False, context=None):
+        self.enabled = enabled
+        self.profile = enabled and profile
+        self.memory = enabled and memory
+        self.context = context or {}
+        self.records = []
+        self.profiles = {}
+        self._stack = []
+        self._owns_tracing = False
+
+    @property
+    def active(self):
+        """True selama ada tahap yang sedang berjalan."""
+        return bool(self._stack)
+
+    def merge(self, other, **fields):
+        """Pindahkan record dan profil `other` yang sudah selesai ke perekam ini (mis. dari thread job).
+
+        Tidak melakukan apa pun selama `other` masih punya tahap berjalan; `fields` ditambahkan ke
+        setiap record yang dipindahkan.
+        """
+        if other.active:
+            return
+        records, other.records = other.records, []
+        profiles, other.profiles = other.profiles, {}
+        self.records.extend({**record, **fields} for record in records if record is not None)
+        self.profiles.update(profiles)
+
+    def stage(self, name, **fields):
+        """Context manager pengukur satu tahap; tahap boleh bersarang."""
+        if not self.enabled:
+            return _DISABLED
+        return self._measure(name, fields)
+
+    def timed(self, name=None):
+        """Decorator versi stage(); nama default adalah nama fungsi."""
+        def decorate(func):
+            stage_name = name or func.__name__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(stage_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    @contextmanager
+    def _measure(self, name, fields):
+        frame = {'peak': 0, 'base': 0}
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            # Puncak sejauh ini milik tahap luar; reset agar puncak tahap ini terukur sendiri
+            for outer in self._stack:
+                outer['peak'] = max(outer['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['base'] = current
+        profiler = None
+        if self.profile and not self._stack:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        depth = len(self._stack)
+        self._stack.append(frame)
+        # Slot dipesan saat mulai agar urutan records mengikuti urutan mulai tahap; list dipegang
+        # sendiri karena merge() bisa memindahkan records ke perekam lain
+        records = self.records
+        index = len(records)
+        records.append(None)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+            self._stack.pop()
+            record = {'stage': name, 'depth': depth, 'seconds': seconds, **fields}
+            if self.memory:
+                frame['peak'] = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], frame['peak'])
+                elif self._owns_tracing:
+                    tracemalloc.stop()
+                    self._owns_tracing = False
+                record['peak_bytes'] = max(0, frame['peak'] - frame['base'])
+            if profiler is not None:
+                self.profiles[name] = profile_summary(profiler)
+            records[index] = record
+            logger.info(json.dumps({**self.context, **record}, default=str))
+
+
+def profile_summary(profiler, limit=PROFILE_LIMIT):
+    """Ringkasan teks pstats (diurutkan waktu kumulatif) dari satu profiler cProfile."""
+    buffer = io.StringIO()
+    pstats.Stats(profiler, stream=buffer).sort_stats('cumulative').print_stats(limit)
+    return buffer.getvalue()
+
+
+def configure_json_log(path=None, level=logging.INFO):
+    """Pasang handler untuk logger 'investa.perf' (file bila path diisi, selain itu stderr); aman dipanggil ulang."""
+    if not any(getattr(handler, '_investa_perf', False) for handler in logger.handlers):
+        handler = logging.FileHandler(path) if path else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        handler._investa_perf = True
+        logger.addHandler(handler)
+    logger.setLevel(level)
+    return logger
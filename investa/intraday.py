@@ -0,0 +1,266 @@
+"""Penyimpanan dan pemrosesan bar intraday (1m-1h) dalam potongan kolumnar per bulan.
+
+Bar disimpan sebagai file Parquet per ticker, interval, dan bulan (waktu lokal bursa tanpa zona
+waktu), dengan catatan rentang yang sudah tercakup per bulan seperti PriceStore, sehingga hanya
+bagian yang belum ada yang diunduh. Pembacaan, resample, dan log return berjalan potongan demi
+potongan (generator): bar mentah satu bulan saja yang ada di memori pada satu waktu, dan bucket
+resample serta harga terakhir yang terpotong batas potongan dibawa ke potongan berikutnya.
+
+Seperti PriceStore, harga yang disimpan sudah disesuaikan (auto_adjust) dan pengambilan baru
+tumpang tindih dengan bar tersimpan; bila penyesuaian berubah, cache ticker/interval itu diunduh
+ulang. Unduhan yang gagal melempar exception dan tidak pernah dicatat sebagai tercakup.
+
+Resample ke harian ('1D') membuat holding period di tab Perhitungan VaR tetap bermakna hari;
+tanpa resample, holding period berarti jumlah bar.
+"""
+import json
+import os
+import re
+import shutil
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from investa.instrumentation import PerfRecorder
+from investa.prices import (DEFAULT_CACHE_PATH, PRICE_COLUMNS, adjustment_changed, merge_coverage, missing_ranges,
+                            yf_history)
+from investa.returns import compute_returns
+
+DEFAULT_INTRADAY_DIR = os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), 'intraday')
+
+# Interval Yahoo Finance -> (rentang maksimum per permintaan, seberapa jauh ke belakang data tersedia)
+INTERVALS = {
+    '1m': (timedelta(days=7), timedelta(days=30)),
+    '2m': (timedelta(days=60), timedelta(days=60)),
+    '5m': (timedelta(days=60), timedelta(days=60)),
+    '15m': (timedelta(days=60), timedelta(days=60)),
+    '30m': (timedelta(days=60), timedelta(days=60)),
+    '60m': (timedelta(days=730), timedelta(days=730)),
+    '90m': (timedelta(days=60), timedelta(days=60)),
+    '1h': (timedelta(days=730), timedelta(days=730)),
+}
+
+# Tumpang tindih pengambilan baru dengan bar tersimpan untuk mendeteksi penyesuaian harga baru
+INTRADAY_OVERLAP = timedelta(days=1)
+
+# Agregasi bar OHLCV saat resample
+BAR_AGGREGATION = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+class _AdjustmentChanged(Exception):
+    """Bar yang diunduh ulang tidak cocok dengan bar tersimpan (penyesuaian harga berubah)."""
+
+
+def yf_download_intraday(ticker, start, end, interval):
+    """Downloader default: bar intraday disesuaikan; melempar DownloadError bila unduhan gagal."""
+    return yf_history(ticker, start=start, end=end, interval=interval)
+
+
+def _month_chunks(start, end):
+    """(label 'YYYY-MM', awal, akhir) untuk setiap bulan yang beririsan dengan [start, end)."""
+    month = start.to_period('M')
+    while month.start_time < end:
+        yield str(month), max(start, month.start_time), min(end, (month + 1).start_time)
+        month += 1
+
+
+def _safe_name(ticker):
+    return re.sub(r'[^\w.-]+', '_', ticker)
+
+
+class IntradayStore:
+    """Cache bar intraday per ticker/interval di folder `root`, satu file Parquet per bulan.
+
+    `downloader` adalah callable (ticker, start, end, interval) -> DataFrame ber-index waktu
+    dengan kolom PRICE_COLUMNS; ganti dengan downloader palsu untuk penggunaan offline.
+    Downloader harus melempar exception bila unduhan gagal (frame kosong = memang tanpa bar).
+    Bar pada atau setelah waktu pengambilan dianggap sementara dan hari itu diunduh ulang
+    setelah `max_age`.
+    """
+
+    def __init__(self, root=DEFAULT_INTRADAY_DIR, downloader=yf_download_intraday,
+                 max_age=timedelta(minutes=15), now=datetime.now):
+        self.root = root
+        self.downloader = downloader
+        self.max_age = max_age
+        self.now = now
+        self._lock = threading.Lock()
+        self._series_locks = defaultdict(threading.Lock)
+
+    def _dir(self, ticker, interval):
+        return os.path.join(self.root, _safe_name(ticker), interval)
+
+    def _chunk_path(self, ticker, interval, label):
+        return os.path.join(self._dir(ticker, interval), f"{label}.parquet")
+
+    def _load_coverage(self, ticker, interval):
+        path = os.path.join(self._dir(ticker, interval), 'coverage.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return {label: tuple(datetime.fromisoformat(value) for value in values)
+                    for label, values in json.load(f).items()}
+
+    def _save_coverage(self, ticker, interval, coverage):
+        path = os.path.join(self._dir(ticker, interval), 'coverage.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump({label: [value.isoformat() for value in values] for label, values in coverage.items()}, f)
+        os.replace(path + '.tmp', path)
+
+    def earliest(self, interval):
+        """Waktu paling awal yang masih bisa diunduh untuk interval ini."""
+        return pd.Timestamp(self.now() - INTERVALS[interval][1] + timedelta(days=1)).normalize()
+
+    def ingest(self, ticker, start, end, interval):
+        """Pastikan bar [start, end) tersimpan, mengunduh hanya rentang yang belum ada.
+
+        Bagian sebelum batas riwayat Yahoo Finance untuk interval ini dilewati.
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Interval tidak didukung: {interval}")
+        start, end = max(pd.Timestamp(start), self.earliest(interval)), pd.Timestamp(end)
+        if start >= end:
+            return
+        os.makedirs(self._dir(ticker, interval), exist_ok=True)
+        with self._lock:
+            series_lock = self._series_locks[ticker, interval]
+        with series_lock:
+            try:
+                self._ingest(ticker, start, end, interval)
+            except _AdjustmentChanged:
+                # Harga tersimpan memakai penyesuaian lama: buang seluruh potongan lalu unduh ulang
+                shutil.rmtree(self._dir(ticker, interval))
+                os.makedirs(self._dir(ticker, interval))
+                self._ingest(ticker, start, end, interval)
+
+    def _ingest(self, ticker, start, end, interval):
+        coverage = self._load_coverage(ticker, interval)
+        try:
+            for label, chunk_start, chunk_end in _month_chunks(start, end):
+                for fetch_start, fetch_end in self._missing_ranges(coverage.get(label), chunk_start, chunk_end):
+                    coverage[label] = self._fetch(ticker, interval, label, fetch_start, fetch_end,
+                                                  coverage.get(label))
+        finally:
+            # Bulan yang sudah berhasil tetap dicatat walaupun bulan berikutnya gagal diunduh
+            self._save_coverage(ticker, interval, {label: value for label, value in coverage.items() if value})
+
+    def _missing_ranges(self, coverage, start, end):
+        return missing_ranges(coverage, start, end, self.now(), self.max_age, INTRADAY_OVERLAP, resolution=pd.Timestamp)
+
+    def _fetch(self, ticker, interval, label, start, end, coverage):
+        span = INTERVALS[interval][0]
+        frames = []
+        fetch_start = start
+        while fetch_start < end:
+            fetch_end = min(end, fetch_start + span)
+            data = self.downloader(ticker, fetch_start, fetch_end, interval)
+            if data is not None and not data.empty:
+                frames.append(data[PRICE_COLUMNS])
+            fetch_start = fetch_end
+        fetched_at = self.now()
+        if coverage is None and not frames:
+            # Ticker tidak dikenal/tanpa data: jangan dicatat agar bisa dicoba lagi
+            return None
+        if frames:
+            new = pd.concat(frames).astype(float)
+            if new.index.tz is not None:
+                # Simpan sebagai waktu lokal bursa tanpa zona waktu, sejajar dengan start/end naif
+                new.index = new.index.tz_localize(None)
+            new = new[(new.index >= start) & (new.index < end)]
+            path = self._chunk_path(ticker, interval, label)
+            if os.path.exists(path):
+                stored = pd.read_parquet(path)
+                if adjustment_changed(stored['Close'], new['Close']):
+                    raise _AdjustmentChanged(label)
+                new = pd.concat([stored, new])
+                new = new[~new.index.duplicated(keep='last')]
+            new.sort_index().rename_axis('Date').to_parquet(path + '.tmp')
+            os.replace(path + '.tmp', path)
+        new_start, new_end, fetched_at = merge_coverage(coverage, pd.Timestamp(start), pd.Timestamp(end),
+                                                        fetched_at, resolution=pd.Timestamp)
+        return pd.Timestamp(new_start).to_pydatetime(), pd.Timestamp(new_end).to_pydatetime(), fetched_at
+
+    def iter_chunks(self, ticker, start, end, interval, columns=None):
+        """Bar tersimpan [start, end) per bulan, dibaca hanya kolom `columns` (default PRICE_COLUMNS)."""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        for label, _, _ in _month_chunks(start, end):
+            path = self._chunk_path(ticker, interval, label)
+            if not os.path.exists(path):
+                continue
+            chunk = pd.read_parquet(path, columns=columns or PRICE_COLUMNS)
+            chunk = chunk[(chunk.index >= start) & (chunk.index < end)]
+            if not chunk.empty:
+                yield chunk
+
+
+def _merge_bars(first, second):
+    """Gabungkan dua bagian dari bucket resample yang sama (first lebih awal)."""
+    merged = second.copy()
+    for column, how in BAR_AGGREGATION.items():
+        if column not in merged:
+            continue
+        if how == 'first':
+            merged[column] = first[column]
+        elif how == 'max':
+            merged[column] = max(first[column], second[column])
+        elif how == 'min':
+            merged[column] = min(first[column], second[column])
+        elif how == 'sum':
+            merged[column] = first[column] + second[column]
+    return merged
+
+
+def resample_bars(chunks, rule):
+    """Resample potongan bar berurutan ke horizon `rule` (mis. '1D', '1h', '15min'); None = tanpa resample.
+
+    Bucket terakhir setiap potongan ditahan dulu karena bisa berlanjut di potongan berikutnya.
+    Bucket tanpa transaksi (akhir pekan, di luar jam bursa) dibuang.
+    """
+    if rule is None:
+        yield from chunks
+        return
+    pending = None
+    for chunk in chunks:
+        aggregation = {column: how for column, how in BAR_AGGREGATION.items() if column in chunk}
+        bars = chunk.resample(rule).agg(aggregation).dropna(subset=['Close'])
+        if bars.empty:
+            continue
+        if pending is not None:
+            if bars.index[0] == pending.index[0]:
+                bars.iloc[0] = _merge_bars(pending.iloc[0], bars.iloc[0])
+            else:
+                yield pending
+        if len(bars) > 1:
+            yield bars.iloc[:-1]
+        pending = bars.iloc[-1:]
+    if pending is not None:
+        yield pending
+
+
+def stream_log_returns(bars, column='Close'):
+    """Tambahkan kolom 'Log Return' ke potongan bar berurutan; harga terakhir dibawa antar potongan."""
+    previous = None
+    for frame in bars:
+        prices = frame[column] if previous is None else pd.concat([previous, frame[column]])
+        returns = compute_returns(prices)
+        frame = frame.copy()
+        frame['Log Return'] = returns.to_numpy()[0 if previous is None else 1:]
+        previous = frame[column].iloc[-1:]
+        yield frame
+
+
+def load_bars(store, ticker, start, end, interval, rule='1D', perf=None):
+    """Unduh (bila perlu) lalu baca bar [start, end) yang sudah di-resample beserta log return-nya.
+
+    Mengembalikan DataFrame ber-index 'Date' dengan PRICE_COLUMNS dan 'Log Return'.
+    """
+    perf = perf or PerfRecorder()
+    with perf.stage('download', ticker=ticker, interval=interval):
+        store.ingest(ticker, start, end, interval)
+    with perf.stage('returns', rule=rule):
+        frames = list(stream_log_returns(resample_bars(store.iter_chunks(ticker, start, end, interval), rule)))
+    if not frames:
+        return pd.DataFrame(columns=PRICE_COLUMNS + ['Log Return'], index=pd.DatetimeIndex([], name='Date'))
+    return pd.concat(frames).rename_axis('Date')
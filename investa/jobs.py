@@ -0,0 +1,186 @@
+"""Job komputasi di latar belakang dengan progres, hasil sementara, pembatalan, dan pemakaian ulang.
+
+Job diidentifikasi oleh hash input (job_key). Meminta job dengan kunci yang sama saat job itu
+masih berjalan atau sudah selesai mengembalikan job yang sama, dari sesi mana pun, sehingga
+perhitungan tidak diulang. Job yang gagal atau dibatalkan diganti job baru saat diminta lagi.
+
+Bila JobManager diberi `cache` (mis. result_cache.ResultCache), hasil job yang selesai ikut
+disimpan di sana dan permintaan berikutnya dengan kunci yang sama dilayani langsung dari cache,
+juga setelah aplikasi dijalankan ulang.
+
+Fungsi job menerima argumen kata kunci `progress`, callable (done, total, partial=None) yang
+dipanggil berkala; pemanggilan itu melempar JobCancelled bila job sudah diminta berhenti.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, DONE, CANCELLED, FAILED = 'pending', 'running', 'done', 'cancelled', 'failed'
+
+
+class JobCancelled(Exception):
+    """Dilempar dari callback progres ketika job dibatalkan."""
+
+
+def job_key(*parts):
+    """Hash stabil dari input job: array/Series/DataFrame di-hash isinya, selebihnya lewat JSON."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (pd.Series, pd.DataFrame)):
+            digest.update(pd.util.hash_pandas_object(part, index=True).values.tobytes())
+        elif isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class Job:
+    """Status satu job; atribut dibaca dari thread UI, ditulis dari thread worker."""
+
+    def __init__(self, key):
+        self.key = key
+        self.status = PENDING
+        self.done_units = 0
+        self.total_units = 0
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cached = False
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+
+    @classmethod
+    def from_cache(cls, key, result):
+        """Job yang sudah selesai dengan hasil dari cache."""
+        job = cls(key)
+        job.status = DONE
+        job.result = result
+        job.cached = True
+        job.started_at = job.finished_at = time.time()
+        job._finished.set()
+        return job
+
+    @property
+    def progress(self):
+        """Fraksi pekerjaan yang selesai (0..1)."""
+        if self.status == DONE:
+            return 1.0
+        return min(1.0, self.done_units / self.total_units) if self.total_units else 0.0
+
+    @property
+    def finished(self):
+        return self.status in (DONE, CANCELLED, FAILED)
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def cancel(self):
+        """Minta job berhenti pada laporan progres berikutnya (job yang belum mulai langsung batal)."""
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        """Tunggu job selesai; True bila sudah selesai dalam batas waktu."""
+        return self._finished.wait(timeout)
+
+    def report(self, done, total, partial=None):
+        if self._cancel.is_set():
+            raise JobCancelled(self.key)
+        self.done_units, self.total_units = done, total
+        if partial is not None:
+            self.partial = partial
+
+    def _run(self, func, args, kwargs):
+        try:
+            if self._cancel.is_set():
+                raise JobCancelled(self.key)
+            self.status = RUNNING
+            self.started_at = time.time()
+            self.result = func(*args, progress=self.report, **kwargs)
+            self.status = DONE
+        except JobCancelled:
+            self.status = CANCELLED
+        except Exception as e:
+            self.error = e
+            self.status = FAILED
+        finally:
+            self.finished_at = time.time()
+            self._finished.set()
+
+
+class JobManager:
+    """Pool worker bersama untuk job berkunci; menyimpan hingga `max_jobs` job terakhir (LRU) di memori."""
+
+    def __init__(self, max_workers=2, max_jobs=32, cache=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='investa-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+        self.cache = cache
+
+    def submit(self, key, func, *args, **kwargs):
+        """Jalankan func(*args, progress=..., **kwargs) sebagai job `key`, atau kembalikan job yang sudah ada."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status not in (CANCELLED, FAILED):
+                self._jobs.move_to_end(key)
+                return job
+            cached = self._cached(key)
+            job = Job(key) if cached is None else Job.from_cache(key, cached)
+            self._jobs[key] = job
+            self._evict()
+        if not job.cached:
+            self._pool.submit(self._execute, job, func, args, kwargs)
+        return job
+
+    def _cached(self, key):
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(key)
+        except Exception:
+            logger.warning("Gagal membaca cache hasil untuk job %s", key, exc_info=True)
+            return None
+
+    def _execute(self, job, func, args, kwargs):
+        job._run(func, args, kwargs)
+        if job.status == DONE and self.cache is not None:
+            try:
+                self.cache.put(job.key, job.result)
+            except Exception:
+                logger.warning("Gagal menyimpan hasil job %s ke cache", job.key, exc_info=True)
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def _evict(self):
+        # Hanya job yang sudah selesai yang boleh dibuang dari daftar
+        for key in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[key].finished:
+                del self._jobs[key]
+
+    def shutdown(self, cancel=True):
+        if cancel:
+            with self._lock:
+                for job in self._jobs.values():
+                    job.cancel()
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,77 @@
+"""Pembacaan file data saham (Excel/CSV/Parquet) yang hanya memuat kolom tanggal dan harga penutupan."""
+import os
+
+import pandas as pd
+
+# Kemungkinan nama kolom harga penutupan, sesuai urutan prioritas
+CLOSE_COLUMN_NAMES = ['Close', 'close', 'Close Price', 'close price', 'price.close',
+                      'CLOSE', 'Closing Price', 'closing price']
+DATE_COLUMN_NAMES = ['Date', 'date']
+
+UPLOAD_TYPES = ['xlsx', 'xls', 'csv', 'parquet']
+
+
+def _file_format(filename):
+    ext = os.path.splitext(filename)[1].lower().lstrip('.')
+    if ext not in UPLOAD_TYPES:
+        raise ValueError(f"Format file tidak didukung: .{ext}")
+    return ext
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def read_header(source, filename):
+    """Baca nama kolom saja tanpa memuat isi file."""
+    fmt = _file_format(filename)
+    _rewind(source)
+    if fmt == 'csv':
+        columns = pd.read_csv(source, nrows=0).columns
+    elif fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        columns = pq.ParquetFile(source).schema_arrow.names
+    else:
+        columns = pd.read_excel(source, nrows=0).columns
+    _rewind(source)
+    return [str(col) for col in columns]
+
+
+def find_column(columns, candidates):
+    for col_name in candidates:
+        if col_name in columns:
+            return col_name
+    return None
+
+
+def load_price_file(source, filename, float32=False):
+    """Muat kolom tanggal dan harga penutupan dari file Excel, CSV, atau Parquet.
+
+    Hanya kolom yang dibutuhkan yang dibaca (usecols/proyeksi kolom). Mengembalikan
+    (DataFrame, nama kolom close); bila kolom close tidak ditemukan, nama kolomnya None dan
+    DataFrame kosong berisi seluruh nama kolom file.
+    """
+    fmt = _file_format(filename)
+    columns = read_header(source, filename)
+    close_col = find_column(columns, CLOSE_COLUMN_NAMES)
+    if close_col is None:
+        return pd.DataFrame(columns=columns), None
+
+    date_col = find_column(columns, DATE_COLUMN_NAMES)
+    usecols = [col for col in columns if col in (date_col, close_col)]
+    dtype = 'float32' if float32 else 'float64'
+
+    if fmt == 'csv':
+        df = pd.read_csv(source, usecols=usecols, dtype={close_col: dtype},
+                         parse_dates=[date_col] if date_col else False)
+    elif fmt == 'parquet':
+        df = pd.read_parquet(source, columns=usecols)
+    else:
+        df = pd.read_excel(source, usecols=usecols)
+
+    df[close_col] = pd.to_numeric(df[close_col], errors='coerce').astype(dtype)
+    if date_col is not None and not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+    return df, close_col
@@ -0,0 +1,162 @@
+"""Model return berekor tebal dan volatility clustering untuk simulasi VaR (Student-t, bootstrap, GARCH).
+
+Setiap model menyediakan antarmuka yang sama dengan montecarlo.NormalModel sehingga bisa
+dipakai langsung oleh montecarlo.simulate_risk: sample(holding_periods, n, rng) mengembalikan
+return kumulatif berukuran (len(holding_periods), n) dan chunk_size() membatasi memori per chunk.
+"""
+import numpy as np
+from scipy import optimize, signal, stats
+
+from investa.montecarlo import CHUNK_BYTES
+
+# Faktor skala return saat estimasi GARCH agar optimizer bekerja pada besaran ~1 (persen)
+GARCH_SCALE = 100.0
+
+
+def _cumulative_at(daily, holding_periods):
+    """Return kumulatif (n, max_hp) -> (len(holding_periods), n) pada holding period yang diminta."""
+    idx = np.asarray(holding_periods, dtype=int) - 1
+    if idx.min() < 0:
+        raise ValueError("Holding period minimal 1 hari")
+    return np.cumsum(daily, axis=1)[:, idx].T
+
+
+class StudentTModel:
+    """Return harian i.i.d. Student-t (loc, scale, df)."""
+
+    def __init__(self, loc, scale, df):
+        self.loc = loc
+        self.scale = scale
+        self.df = df
+
+    def sample(self, holding_periods, n, rng):
+        daily = self.loc + self.scale * rng.standard_t(self.df, size=(n, max(holding_periods)))
+        return _cumulative_at(daily, holding_periods)
+
+    def chunk_size(self, holding_periods, chunk_bytes=CHUNK_BYTES):
+        # cumsum membuat salinan kedua berukuran sama
+        return max(1, chunk_bytes // (16 * max(holding_periods)))
+
+
+class BootstrapModel:
+    """Bootstrap historis: return harian diambil acak dengan pengembalian dari data historis."""
+
+    def __init__(self, returns):
+        returns = np.asarray(returns, dtype=float)
+        self.returns = returns[~np.isnan(returns)]
+        if len(self.returns) == 0:
+            raise ValueError("Data return kosong")
+
+    def sample(self, holding_periods, n, rng):
+        idx = rng.integers(0, len(self.returns), size=(n, max(holding_periods)))
+        return _cumulative_at(self.returns[idx], holding_periods)
+
+    def chunk_size(self, holding_periods, chunk_bytes=CHUNK_BYTES):
+        # indeks int64, return hasil ambil, dan hasil cumsum
+        return max(1, chunk_bytes // (24 * max(holding_periods)))
+
+
+class GarchModel:
+    """GARCH(1,1): r_t = mu + sigma_t * e_t, sigma2_t = omega + alpha * (r_{t-1} - mu)^2 + beta * sigma2_{t-1}.
+
+    Simulasi dimulai dari `sigma2_next` (variansi hari berikutnya hasil filter data historis).
+    Bila `residuals` diberikan, inovasi e_t diambil acak dari residual terstandar historis
+    (filtered historical simulation); jika tidak, e_t ~ N(0, 1). Rekursi berjalan per hari,
+    tetapi setiap langkah dihitung sekaligus untuk semua jalur dalam chunk.
+    """
+
+    def __init__(self, mu, omega, alpha, beta, sigma2_next, residuals=None):
+        self.mu = mu
+        self.omega = omega
+        self.alpha = alpha
+        self.beta = beta
+        self.sigma2_next = sigma2_next
+        self.residuals = None if residuals is None else np.asarray(residuals, dtype=float)
+
+    def sample(self, holding_periods, n, rng):
+        idx = np.asarray(holding_periods, dtype=int) - 1
+        if idx.min() < 0:
+            raise ValueError("Holding period minimal 1 hari")
+        cum_returns = np.empty((len(idx), n))
+        sigma2 = np.full(n, self.sigma2_next, dtype=float)
+        total = np.zeros(n)
+        for day in range(idx.max() + 1):
+            if self.residuals is None:
+                innovations = rng.standard_normal(n)
+            else:
+                innovations = self.residuals[rng.integers(0, len(self.residuals), size=n)]
+            shock = np.sqrt(sigma2) * innovations
+            total += self.mu + shock
+            cum_returns[idx == day] = total
+            sigma2 = self.omega + self.alpha * shock**2 + self.beta * sigma2
+        return cum_returns
+
+    def chunk_size(self, holding_periods, chunk_bytes=CHUNK_BYTES):
+        # Beberapa vektor kerja per jalur ditambah hasil per holding period
+        return max(1, chunk_bytes // (8 * (6 + len(holding_periods))))
+
+
+def fit_student_t(returns):
+    """Estimasi MLE distribusi Student-t untuk return harian."""
+    returns = np.asarray(returns, dtype=float)
+    df, loc, scale = stats.t.fit(returns[~np.isnan(returns)])
+    return StudentTModel(loc, scale, df)
+
+
+def garch_variance(residuals, omega, alpha, beta, sigma2_0):
+    """Filter variansi GARCH(1,1) untuk residual historis; mengembalikan sigma2_t untuk t = 0..T.
+
+    Elemen terakhir adalah prakiraan variansi satu hari setelah data berakhir.
+    Rekursi linear sigma2_t = x_t + beta * sigma2_{t-1} dijalankan lewat scipy.signal.lfilter.
+    """
+    inputs = omega + alpha * residuals**2
+    filtered = signal.lfilter([1.0], [1.0, -beta], inputs, zi=[beta * sigma2_0])[0]
+    return np.concatenate([[sigma2_0], filtered])
+
+
+def _garch_neg_loglik(params, returns, sigma2_0):
+    mu, omega, alpha, beta = params
+    residuals = returns - mu
+    sigma2 = garch_variance(residuals, omega, alpha, beta, sigma2_0)[:-1]
+    return 0.5 * np.sum(np.log(sigma2) + residuals**2 / sigma2)
+
+
+def fit_garch(returns, filtered=False):
+    """Estimasi GARCH(1,1) dengan quasi-maximum likelihood (inovasi Normal).
+
+    Dengan filtered=True, model yang dikembalikan mensimulasikan inovasi dari residual terstandar
+    historis (filtered bootstrap) alih-alih distribusi Normal. ValueError bila optimasi tidak konvergen.
+    """
+    returns = np.asarray(returns, dtype=float)
+    returns = returns[~np.isnan(returns)] * GARCH_SCALE
+    if len(returns) < 10:
+        raise ValueError("Data return terlalu sedikit untuk estimasi GARCH")
+    variance = returns.var()
+    start = [returns.mean(), 0.1 * variance, 0.05, 0.85]
+    bounds = [(None, None), (1e-8 * variance, 10 * variance), (0.0, 1.0), (0.0, 1.0)]
+    stationary = {'type': 'ineq', 'fun': lambda params: 0.9999 - params[2] - params[3]}
+    fit = optimize.minimize(_garch_neg_loglik, start, args=(returns, variance), method='SLSQP',
+                            bounds=bounds, constraints=[stationary])
+    if not fit.success or not np.all(np.isfinite(fit.x)):
+        raise ValueError(f"Estimasi GARCH tidak konvergen ({fit.message}); gunakan model simulasi lain")
+    mu, omega, alpha, beta = fit.x
+    residuals = returns - mu
+    sigma2 = garch_variance(residuals, omega, alpha, beta, variance)
+    standardized = residuals / np.sqrt(sigma2[:-1]) if filtered else None
+    return GarchModel(mu / GARCH_SCALE, omega / GARCH_SCALE**2, alpha, beta, sigma2[-1] / GARCH_SCALE**2,
+                      residuals=standardized)
+
+
+MODEL_FITTERS = {
+    'student_t': fit_student_t,
+    'bootstrap': BootstrapModel,
+    'garch': fit_garch,
+    'filtered_garch': lambda returns: fit_garch(returns, filtered=True),
+}
+
+
+def fit_model(name, returns):
+    """Bangun model simulasi berdasarkan nama (kunci MODEL_FITTERS) dari data log return."""
+    if name not in MODEL_FITTERS:
+        raise ValueError(f"Model simulasi tidak dikenal: {name}")
+    return MODEL_FITTERS[name](returns)
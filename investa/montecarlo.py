@@ -0,0 +1,668 @@
+"""Simulasi Monte Carlo untuk Value at Risk (VaR)."""
+import math
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import numpy as np
+from scipy import stats
+from scipy.stats import qmc
+
+# Batas memori matriks jalur per chunk (byte); jumlah jalur per chunk menyesuaikan holding period
+CHUNK_BYTES = 64 * 1024 * 1024
+
+# Metode sampling: jalur harian penuh, satu draw per jalur (return hp hari ~ N(hp*mu, hp*sigma^2)),
+# atau quasi-Monte Carlo Sobol dengan satu draw per jalur
+SAMPLERS = ('paths', 'collapsed', 'qmc')
+
+# Jumlah minimum replikasi Sobol teracak untuk estimasi standard error QMC
+QMC_REPLICATES = 16
+
+# Batas memori buffer ekor eksak (byte, semua holding period); di atasnya simulate_risk memakai
+# TailSketch dua lintasan yang memorinya tidak tumbuh sebanding alpha x iterasi
+TAIL_BYTES = 64 * 1024 * 1024
+
+# Jumlah bin histogram per holding period pada TailSketch
+SKETCH_BINS = 4096
+
+# Kuantil normal untuk interval kepercayaan 95%
+Z_95 = 1.959963984540054
+
+
+def var_order_index(alpha, iterations):
+    # Indeks order statistic yang sama dengan simulations[int(alpha * iterations)]
+    return min(int(alpha * iterations), iterations - 1)
+
+
+def tail_size_for(alphas, iterations):
+    # Jumlah nilai terkecil yang dibutuhkan untuk VaR dan interval kepercayaan setiap alpha
+    return max(var_order_index(alpha, iterations) + order_stat_band(alpha, iterations) for alpha in alphas) + 1
+
+
+def tail_iteration_limit(alphas, rows, tail_bytes=TAIL_BYTES):
+    """Jumlah iterasi terbesar yang TailBuffer-nya (rows baris) masih muat dalam tail_bytes."""
+    low, high = 1, 1
+    while 16 * rows * tail_size_for(alphas, high) <= tail_bytes:
+        low, high = high, high * 2
+    while high - low > 1:
+        middle = (low + high) // 2
+        if 16 * rows * tail_size_for(alphas, middle) <= tail_bytes:
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def default_chunk_size(holding_periods, chunk_bytes=CHUNK_BYTES, sampler='paths'):
+    return NormalModel(0, 0, sampler).chunk_size(holding_periods, chunk_bytes)
+
+
+def order_stat_band(alpha, iterations):
+    # Setengah lebar interval kepercayaan 95% order statistic (aproksimasi binomial), dalam indeks
+    return math.ceil(Z_95 * math.sqrt(iterations * alpha * (1 - alpha)))
+
+
+def parametric_var(mean, std, alphas, holding_periods):
+    """VaR closed-form untuk model Normal: return hp hari ~ N(hp*mean, hp*std^2).
+
+    Mengembalikan array berukuran (len(alphas), len(holding_periods)).
+    """
+    z = stats.norm.ppf(np.asarray(alphas, dtype=float))[:, np.newaxis]
+    hp = np.asarray(holding_periods, dtype=float)
+    return mean * hp + z * std * np.sqrt(hp)
+
+
+def chunk_seeds(seed, iterations, chunk_size):
+    """Bagi iterasi menjadi chunk, masing-masing dengan SeedSequence anak yang independen.
+
+    Pembagian chunk hanya bergantung pada seed dan chunk_size, sehingga hasil simulasi
+    identik berapa pun jumlah worker yang mengerjakannya.
+    """
+    n_chunks = -(-iterations // chunk_size)
+    children = np.random.SeedSequence(seed).spawn(n_chunks)
+    return [(child, min(chunk_size, iterations - i * chunk_size)) for i, child in enumerate(children)]
+
+
+def simulate_cumulative_returns(mean, std, holding_periods, iterations, rng):
+    """Simulasikan return kumulatif untuk setiap holding period dari satu matriks jalur.
+
+    Mengembalikan array berukuran (len(holding_periods), iterations).
+    """
+    if min(holding_periods) < 1:
+        raise ValueError("Holding period harus minimal 1 hari")
+    max_hp = max(holding_periods)
+    paths = rng.normal(mean, std, size=(iterations, max_hp))
+    np.cumsum(paths, axis=1, out=paths)
+    return np.ascontiguousarray(paths[:, [hp - 1 for hp in holding_periods]].T)
+
+
+def sample_cumulative_returns(mean, std, holding_periods, iterations, rng, sampler='paths'):
+    """Return kumulatif (len(holding_periods), iterations) dengan metode sampling pilihan."""
+    if sampler == 'paths':
+        return simulate_cumulative_returns(mean, std, holding_periods, iterations, rng)
+    if min(holding_periods) < 1:
+        raise ValueError("Holding period harus minimal 1 hari")
+    if sampler == 'collapsed':
+        z = rng.standard_normal(iterations)
+    elif sampler == 'qmc':
+        with warnings.catch_warnings():
+            # Jumlah titik bukan pangkat 2 hanya terjadi pada chunk terakhir
+            warnings.simplefilter('ignore', UserWarning)
+            u = qmc.Sobol(d=1, scramble=True, rng=rng).random(iterations)[:, 0]
+        z = stats.norm.ppf(u)
+    else:
+        raise ValueError(f"Metode sampling tidak dikenal: {sampler}")
+    hp = np.asarray(holding_periods, dtype=float)[:, np.newaxis]
+    return hp * mean + np.sqrt(hp) * std * z
+
+
+class NormalModel:
+    """Model return harian Normal i.i.d. dengan metode sampling pilihan (lihat SAMPLERS).
+
+    Setiap model simulasi menyediakan sample(holding_periods, n, rng) yang mengembalikan return
+    kumulatif berukuran (len(holding_periods), n), serta chunk_size() untuk batas memori per chunk.
+    """
+
+    def __init__(self, mean, std, sampler='paths'):
+        if sampler not in SAMPLERS:
+            raise ValueError(f"Metode sampling tidak dikenal: {sampler}")
+        self.mean = mean
+        self.std = std
+        self.sampler = sampler
+        # Replikasi Sobol teracak per chunk dipakai untuk standard error batch-means
+        self.replicated = sampler == 'qmc'
+
+    def sample(self, holding_periods, n, rng):
+        return sample_cumulative_returns(self.mean, self.std, holding_periods, n, rng, self.sampler)
+
+    def chunk_size(self, holding_periods, chunk_bytes=CHUNK_BYTES):
+        floats_per_path = max(holding_periods) if self.sampler == 'paths' else len(holding_periods)
+        return max(1, chunk_bytes // (8 * floats_per_path))
+
+
+class _OrderStatistics:
+    """Query VaR dan interval kepercayaan di atas order_statistics(indices) milik subclass."""
+
+    def quantiles(self, alphas, iterations):
+        """Order statistic VaR untuk setiap alpha, berukuran (rows, len(alphas))."""
+        return self.order_statistics([var_order_index(alpha, iterations) for alpha in alphas])
+
+    def order_stat_interval(self, alphas, iterations):
+        """Interval kepercayaan 95% VaR dari order statistic; (bawah, atas) berukuran (rows, len(alphas))."""
+        lower = [max(var_order_index(alpha, iterations) - order_stat_band(alpha, iterations), 0)
+                 for alpha in alphas]
+        upper = [var_order_index(alpha, iterations) + order_stat_band(alpha, iterations) for alpha in alphas]
+        bounds = self.order_statistics(lower + upper)
+        return bounds[:, :len(alphas)], bounds[:, len(alphas):]
+
+    def order_stat_stderr(self, alphas, iterations):
+        """Standard error VaR dari interval kepercayaan 95% order statistic, berukuran (rows, len(alphas))."""
+        lower, upper = self.order_stat_interval(alphas, iterations)
+        return (upper - lower) / (2 * Z_95)
+
+
+class TailBuffer(_OrderStatistics):
+    """Menyimpan tepat `size` nilai terkecil dari aliran simulasi untuk setiap baris (holding period).
+
+    Memori hanya sebanding dengan fraksi ekor (alpha x iterasi), bukan total iterasi.
+    Kapasitas internal dilebihkan agar pemadatan dengan np.partition tidak terjadi di setiap chunk.
+    """
+
+    def __init__(self, rows, size, chunk_size):
+        self.size = size
+        self.capacity = max(2 * size, size + min(size, chunk_size))
+        self.values = np.empty((rows, self.capacity))
+        self.counts = np.zeros(rows, dtype=np.int64)
+        self.thresholds = np.full(rows, np.inf)
+
+    def push(self, chunk, rows=None):
+        for row, data in zip(rows if rows is not None else range(len(chunk)), chunk):
+            self._push_row(row, data)
+
+    def merge(self, other):
+        for row in range(len(self.counts)):
+            self._push_row(row, other.tail(row))
+
+    def _push_row(self, row, data):
+        candidates = data[data < self.thresholds[row]]
+        if len(candidates) > self.size:
+            candidates = np.partition(candidates, self.size - 1)[:self.size]
+        if self.counts[row] + len(candidates) > self.capacity:
+            self._compact(row)
+            candidates = candidates[candidates < self.thresholds[row]]
+        count = self.counts[row]
+        self.values[row, count:count + len(candidates)] = candidates
+        self.counts[row] = count + len(candidates)
+
+    def _compact(self, row):
+        count = self.counts[row]
+        if count < self.size:
+            return
+        data = self.values[row, :count]
+        data[:] = np.partition(data, self.size - 1)
+        self.counts[row] = self.size
+        self.thresholds[row] = data[self.size - 1]
+
+    def tail(self, row):
+        self._compact(row)
+        return self.values[row, :self.counts[row]]
+
+    def order_statistics(self, indices):
+        """Order statistic ke-`indices` (0-based) untuk setiap baris, berukuran (rows, len(indices))."""
+        result = np.empty((len(self.counts), len(indices)))
+        for row in range(len(self.counts)):
+            tail = self.tail(row)
+            clipped = [min(index, len(tail) - 1) for index in indices]
+            part = np.partition(tail, sorted(set(clipped)))
+            result[row] = part[clipped]
+        return result
+
+    def expected_shortfall(self, alphas, iterations):
+        """Expected Shortfall: rata-rata simulasi yang tidak lebih besar dari order statistic VaR."""
+        indices = [var_order_index(alpha, iterations) for alpha in alphas]
+        result = np.empty((len(self.counts), len(alphas)))
+        for row in range(len(self.counts)):
+            tail = self.tail(row)
+            head = np.sort(np.partition(tail, min(max(indices), len(tail) - 1))[:max(indices) + 1])
+            cumsum = np.cumsum(head)
+            result[row] = [cumsum[min(k, len(head) - 1)] / (min(k, len(head) - 1) + 1) for k in indices]
+        return result
+
+    def histograms(self, alpha, iterations, bins):
+        """Histogram ekor (nilai <= order statistic VaR alpha) per baris; list (counts, bin_edges)."""
+        k = var_order_index(alpha, iterations)
+        result = []
+        for row in range(len(self.counts)):
+            tail = self.tail(row)
+            head = np.partition(tail, min(k, len(tail) - 1))[:k + 1]
+            result.append(np.histogram(head, bins=bins))
+        return result
+
+
+class TailSketch(_OrderStatistics):
+    """Order statistic eksak dari aliran simulasi dengan memori tetap, dihitung dalam dua lintasan.
+
+    Lintasan pertama (count) mengisi histogram per baris: jumlah dan total nilai per bin, dengan
+    batas bin dari quantile sampel pilot sehingga setiap bin memuat kira-kira iterasi / bins nilai.
+    Setelah select(indices), lintasan kedua mensimulasikan ulang chunk yang sama dan hanya menyimpan
+    nilai di bin yang memuat order statistic yang diminta (collect, lalu fill). Memori sebanding
+    dengan iterasi / bins per order statistic, bukan alpha x iterasi seperti TailBuffer.
+    """
+
+    def __init__(self, pilot, bins=SKETCH_BINS):
+        self.edges = []
+        for data in pilot:
+            data = np.sort(data)
+            self.edges.append(np.unique(data[np.linspace(0, len(data) - 1, bins + 1).astype(np.int64)]))
+        self.counts = [np.zeros(len(edges) + 1, dtype=np.int64) for edges in self.edges]
+        self.sums = [np.zeros(len(edges) + 1) for edges in self.edges]
+        self.minimums = np.full(len(self.edges), np.inf)
+        self.selected = None
+
+    def histogram(self, chunk):
+        """(counts, sums, minimum) per baris untuk satu chunk; dijalankan di worker."""
+        result = []
+        for edges, data in zip(self.edges, chunk):
+            index = np.searchsorted(edges, data, side='right')
+            result.append((np.bincount(index, minlength=len(edges) + 1),
+                           np.bincount(index, weights=data, minlength=len(edges) + 1), data.min()))
+        return result
+
+    def count(self, histogram):
+        for row, (counts, sums, minimum) in enumerate(histogram):
+            self.counts[row] += counts
+            self.sums[row] += sums
+            self.minimums[row] = min(self.minimums[row], minimum)
+
+    def _bins(self, row, indices):
+        # Bin yang memuat order statistic ke-indices (dibatasi ke nilai terakhir)
+        below = self.below[row]
+        clipped = np.minimum(indices, below[-1] - 1)
+        return clipped, np.searchsorted(below, clipped, side='right') - 1
+
+    def approximate_quantiles(self, alphas, iterations):
+        """Batas atas bin yang memuat order statistic VaR; estimasi sementara selama lintasan pertama."""
+        self.below = [np.concatenate(([0], np.cumsum(counts))) for counts in self.counts]
+        indices = [var_order_index(alpha, iterations) for alpha in alphas]
+        result = np.empty((len(self.edges), len(alphas)))
+        for row, edges in enumerate(self.edges):
+            _, bins = self._bins(row, indices)
+            result[row] = edges[np.minimum(bins, len(edges) - 1)]
+        return result
+
+    def select(self, indices):
+        """Tandai bin yang memuat order statistic ke-indices (0-based) untuk lintasan kedua."""
+        self.below = [np.concatenate(([0], np.cumsum(counts))) for counts in self.counts]
+        self.selected = [np.unique(self._bins(row, indices)[1]) for row in range(len(self.edges))]
+
+    def collect(self, chunk):
+        """Nilai chunk yang jatuh di bin terpilih, per baris; dijalankan di worker."""
+        return [data[np.isin(np.searchsorted(edges, data, side='right'), selected)]
+                for edges, selected, data in zip(self.edges, self.selected, chunk)]
+
+    def fill(self, collected):
+        """Simpan hasil collect seluruh chunk (list per baris berisi list array)."""
+        self.values = [np.sort(np.concatenate(parts)) if parts else np.empty(0) for parts in collected]
+        self.offsets = [np.concatenate(([0], np.cumsum(counts[selected])))
+                        for counts, selected in zip(self.counts, self.selected)]
+
+    def _locate(self, row, indices):
+        # Posisi order statistic ke-indices di dalam self.values[row]
+        clipped, bins = self._bins(row, indices)
+        position = np.searchsorted(self.selected[row], bins)
+        return self.offsets[row][position] + clipped - self.below[row][bins], clipped, bins
+
+    def order_statistics(self, indices):
+        """Order statistic ke-`indices` (0-based) untuk setiap baris, berukuran (rows, len(indices))."""
+        result = np.empty((len(self.edges), len(indices)))
+        for row in range(len(self.edges)):
+            result[row] = self.values[row][self._locate(row, indices)[0]]
+        return result
+
+    def expected_shortfall(self, alphas, iterations):
+        """Expected Shortfall: rata-rata simulasi yang tidak lebih besar dari order statistic VaR."""
+        indices = [var_order_index(alpha, iterations) for alpha in alphas]
+        result = np.empty((len(self.edges), len(alphas)))
+        for row in range(len(self.edges)):
+            positions, clipped, bins = self._locate(row, indices)
+            for i, (position, k, b) in enumerate(zip(positions, clipped, bins)):
+                start = position - (k - self.below[row][b])
+                head = self.sums[row][:b].sum() + self.values[row][start:position + 1].sum()
+                result[row, i] = head / (k + 1)
+        return result
+
+    def histogram_edges(self, alpha, iterations, bins):
+        """Batas bin histogram ekor (minimum s.d. order statistic VaR alpha) per baris."""
+        var = self.quantiles([alpha], iterations)[:, 0]
+        return [np.histogram_bin_edges([minimum, value], bins=bins) for minimum, value in zip(self.minimums, var)]
+
+    def tail_excess(self, alpha, iterations):
+        """Jumlah nilai yang sama dengan VaR tetapi di luar k + 1 nilai terkecil, per baris."""
+        k = var_order_index(alpha, iterations)
+        result = []
+        for row in range(len(self.edges)):
+            position, clipped, bins = self._locate(row, [k])
+            start = position[0] - (clipped[0] - self.below[row][bins[0]])
+            end = start + self.counts[row][bins[0]]
+            ties = np.searchsorted(self.values[row][start:end], self.values[row][position[0]], side='right')
+            result.append(self.below[row][bins[0]] + ties - (clipped[0] + 1))
+        return result
+
+
+def _chunk_rng(child):
+    # Generator baru dari salinan SeedSequence: sampler yang memanggil spawn (mis. Sobol) mengubah
+    # state SeedSequence aslinya, padahal TailSketch mensimulasikan ulang chunk yang sama
+    return np.random.default_rng(np.random.SeedSequence(child.entropy, spawn_key=child.spawn_key,
+                                                        pool_size=child.pool_size))
+
+
+def _chunk_quantiles(cum_returns, alphas):
+    # Estimasi per chunk (replikasi independen) untuk standard error batch-means
+    if alphas is None:
+        return None
+    n = cum_returns.shape[1]
+    indices = sorted({var_order_index(alpha, n) for alpha in alphas})
+    part = np.partition(cum_returns, indices, axis=1)
+    return part[:, [var_order_index(alpha, n) for alpha in alphas]]
+
+
+def _chunk_tail(model, holding_periods, tail_size, alphas, child, n):
+    """Simulasikan satu chunk; kembalikan (min(tail_size, n) nilai terkecil per baris, quantile chunk)."""
+    cum_returns = model.sample(holding_periods, n, _chunk_rng(child))
+    quantiles = _chunk_quantiles(cum_returns, alphas)
+    if tail_size < n:
+        cum_returns = np.partition(cum_returns, tail_size - 1, axis=1)[:, :tail_size]
+    return cum_returns, quantiles
+
+
+def _chunk_histogram(model, holding_periods, sketch, alphas, child, n):
+    """Lintasan pertama TailSketch untuk satu chunk: (histogram, quantile chunk)."""
+    cum_returns = model.sample(holding_periods, n, _chunk_rng(child))
+    return sketch.histogram(cum_returns), _chunk_quantiles(cum_returns, alphas)
+
+
+def _chunk_collect(model, holding_periods, sketch, child, n):
+    """Lintasan kedua TailSketch untuk satu chunk: nilai di bin terpilih per baris."""
+    return sketch.collect(model.sample(holding_periods, n, _chunk_rng(child)))
+
+
+def _chunk_tail_histogram(model, holding_periods, edges, child, n):
+    """Histogram nilai <= batas atas edges per baris untuk satu chunk."""
+    cum_returns = model.sample(holding_periods, n, _chunk_rng(child))
+    return [np.histogram(data[data <= row_edges[-1]], bins=row_edges)[0]
+            for row_edges, data in zip(edges, cum_returns)]
+
+
+def _run_chunks(func, args, seeds, workers, executor, consume, ordered=False):
+    """Jalankan func(*args, child, n) untuk setiap chunk dan serahkan hasilnya ke consume(index, n, result).
+
+    Dengan workers > 1 setiap chunk menjadi future tersendiri (paling banyak 2 x workers yang
+    menunggu) dan consume dipanggil di thread pemanggil begitu chunk selesai, dalam urutan selesai,
+    atau dalam urutan chunk bila ordered=True (untuk penjumlahan float yang harus deterministik).
+    Exception dari consume membatalkan chunk yang belum berjalan; hanya chunk yang sedang
+    berjalan yang ditunggu.
+    """
+    if workers == 1:
+        for index, (child, n) in enumerate(seeds):
+            consume(index, n, func(*args, child, n))
+        return
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    pool = pool_class(max_workers=workers)
+    chunks = iter(enumerate(seeds))
+    pending = {}
+
+    def submit_next():
+        for index, (child, n) in chunks:
+            pending[pool.submit(func, *args, child, n)] = (index, n)
+            return
+
+    try:
+        for _ in range(2 * workers):
+            submit_next()
+        while pending:
+            if ordered:
+                finished = [next(iter(pending))]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index, n = pending.pop(future)
+                consume(index, n, future.result())
+                submit_next()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def simulate_risk(model, alphas, holding_periods, iterations, seed=None, chunk_size=None,
+                  workers=1, executor="process", stderr=True, ladder=(), bins=0, progress=None,
+                  tail_bytes=TAIL_BYTES):
+    """Hitung VaR, Expected Shortfall dan metrik ekor dari satu simulasi model return apa pun.
+
+    Jalur disimulasikan per chunk sehingga memori tetap terbatas berapa pun jumlah iterasinya:
+    bila buffer ekor eksak melebihi tail_bytes, order statistic dihitung dengan TailSketch (dua
+    lintasan, tiga bila bins > 0) dengan mensimulasikan ulang chunk yang sama.
+    Dengan workers > 1, setiap chunk dikerjakan pool proses/thread dan ekornya digabung begitu
+    selesai; untuk seed yang sama hasilnya identik bit demi bit dengan eksekusi satu worker.
+
+    Standard error dihitung dari interval kepercayaan order statistic, atau dari sebaran antar
+    chunk (batch means) bila model.replicated (mis. QMC).
+
+    Mengembalikan dict berisi 'var', 'es' dan (bila stderr=True) 'stderr' berukuran
+    (len(alphas), len(holding_periods)); 'ladder' berukuran (len(ladder), len(holding_periods))
+    untuk tangga quantile tambahan; dan 'histogram' (bila bins > 0) berupa list (counts, bin_edges)
+    per holding period untuk ekor di bawah VaR alpha terbesar.
+
+    `progress`, bila diberikan, dipanggil sebagai progress(done, total, partial) setiap chunk
+    selesai, dengan total = iterations x jumlah lintasan dan partial = {'var': ..., 'iterations': done}
+    berisi estimasi VaR sementara (hanya pada lintasan pertama). Exception dari callback menghentikan
+    simulasi (dipakai untuk pembatalan): chunk yang belum berjalan dibatalkan.
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    chunk_size = chunk_size or model.chunk_size(holding_periods)
+    replicated = getattr(model, 'replicated', False)
+    if replicated:
+        # Chunk = satu replikasi; ukurannya pangkat 2 (Sobol) dan jumlahnya minimal QMC_REPLICATES
+        chunk_size = min(chunk_size, max(1, iterations // QMC_REPLICATES))
+        chunk_size = 2 ** int(math.log2(chunk_size))
+    tail_size = tail_size_for(list(alphas) + list(ladder), iterations)
+    seeds = chunk_seeds(seed, iterations, chunk_size)
+    workers = max(1, min(workers, len(seeds)))
+    batch_alphas = alphas if replicated and stderr else None
+
+    rows = len(holding_periods)
+    chunk_quantiles = [None] * len(seeds)
+    if 16 * rows * tail_size <= tail_bytes:
+        buffer = TailBuffer(rows, tail_size, chunk_size)
+        done = 0
+
+        def consume(index, n, result):
+            nonlocal done
+            smallest, chunk_quantiles[index] = result
+            buffer.push(smallest)
+            done += n
+            if progress is not None:
+                progress(done, iterations, {'var': buffer.quantiles(alphas, done).T, 'iterations': done})
+
+        _run_chunks(_chunk_tail, (model, holding_periods, tail_size, batch_alphas), seeds, workers, executor,
+                    consume)
+    else:
+        buffer = _sketch_tail(model, holding_periods, seeds, workers, executor, alphas, ladder, batch_alphas,
+                              chunk_quantiles, progress, passes=3 if bins else 2)
+    result = {
+        'var': buffer.quantiles(alphas, iterations).T,
+        'es': buffer.expected_shortfall(alphas, iterations).T,
+    }
+    if stderr and replicated:
+        replicates = np.sort(np.stack(chunk_quantiles), axis=0)
+        result['stderr'] = (replicates.std(axis=0, ddof=1) / np.sqrt(len(replicates)) if len(replicates) > 1
+                            else np.full(replicates.shape[1:], np.nan)).T
+    elif stderr:
+        result['stderr'] = buffer.order_stat_stderr(alphas, iterations).T
+    if len(ladder):
+        result['ladder'] = buffer.quantiles(ladder, iterations).T
+    if bins and isinstance(buffer, TailSketch):
+        result['histogram'] = _sketch_histograms(model, holding_periods, seeds, workers, executor, buffer,
+                                                 max(alphas), bins, progress)
+    elif bins:
+        result['histogram'] = buffer.histograms(max(alphas), iterations, bins)
+    return result
+
+
+def _sketch_tail(model, holding_periods, seeds, workers, executor, alphas, ladder, batch_alphas, chunk_quantiles,
+                 progress, passes):
+    """Dua lintasan TailSketch (histogram lalu nilai di bin terpilih); progress dihitung atas passes lintasan."""
+    iterations = sum(n for _, n in seeds)
+    child, n = seeds[0]
+    pilot = model.sample(holding_periods, n, _chunk_rng(child))
+    sketch = TailSketch(pilot)
+    sketch.count(sketch.histogram(pilot))
+    chunk_quantiles[0] = _chunk_quantiles(pilot, batch_alphas)
+    del pilot
+    done = n
+
+    def count(index, n, result):
+        nonlocal done
+        histogram, chunk_quantiles[index + 1] = result
+        sketch.count(histogram)
+        done += n
+        if progress is not None:
+            progress(done, passes * iterations,
+                     {'var': sketch.approximate_quantiles(alphas, done).T, 'iterations': done})
+
+    _run_chunks(_chunk_histogram, (model, holding_periods, sketch, batch_alphas), seeds[1:], workers, executor,
+                count, ordered=True)
+
+    indices = [var_order_index(alpha, iterations) for alpha in list(alphas) + list(ladder)]
+    indices += [max(var_order_index(alpha, iterations) - order_stat_band(alpha, iterations), 0) for alpha in alphas]
+    indices += [var_order_index(alpha, iterations) + order_stat_band(alpha, iterations) for alpha in alphas]
+    sketch.select(indices)
+    collected = [[] for _ in holding_periods]
+
+    def collect(index, n, result):
+        nonlocal done
+        for parts, values in zip(collected, result):
+            parts.append(values)
+        done += n
+        if progress is not None:
+            progress(done, passes * iterations)
+
+    _run_chunks(_chunk_collect, (model, holding_periods, sketch), seeds, workers, executor, collect)
+    sketch.fill(collected)
+    return sketch
+
+
+def _sketch_histograms(model, holding_periods, seeds, workers, executor, sketch, alpha, bins, progress):
+    """Lintasan ketiga: histogram ekor di bawah VaR alpha, sama dengan TailBuffer.histograms."""
+    iterations = sum(n for _, n in seeds)
+    edges = sketch.histogram_edges(alpha, iterations, bins)
+    counts = [np.zeros(bins, dtype=np.int64) for _ in holding_periods]
+    done = 2 * iterations
+
+    def add(index, n, result):
+        nonlocal done
+        for total, chunk_counts in zip(counts, result):
+            total += chunk_counts
+        done += n
+        if progress is not None:
+            progress(done, 3 * iterations)
+
+    _run_chunks(_chunk_tail_histogram, (model, holding_periods, edges), seeds, workers, executor, add)
+    # Nilai kembar VaR di luar k + 1 nilai terkecil tidak termasuk ekor (bin terakhir)
+    for total, excess in zip(counts, sketch.tail_excess(alpha, iterations)):
+        total[-1] -= excess
+    return list(zip(counts, edges))
+
+
+def monte_carlo_risk(mean, std, alphas, holding_periods, iterations, sampler='paths', **kwargs):
+    """simulate_risk untuk model Normal (Monte Carlo dengan distribusi Normal)."""
+    return simulate_risk(NormalModel(mean, std, sampler), alphas, holding_periods, iterations, **kwargs)
+
+
+def monte_carlo_var(mean, std, alphas, holding_periods, iterations, seed=None, chunk_size=None,
+                    workers=1, executor="process", sampler='paths', return_stderr=False):
+    """VaR Monte Carlo berukuran (len(alphas), len(holding_periods)), atau (VaR, standard error)
+    bila return_stderr=True. Lihat monte_carlo_risk.
+    """
+    result = monte_carlo_risk(mean, std, alphas, holding_periods, iterations, sampler=sampler, seed=seed,
+                              chunk_size=chunk_size, workers=workers, executor=executor, stderr=return_stderr)
+    if return_stderr:
+        return result['var'], result['stderr']
+    return result['var']
+
+
+def adaptive_monte_carlo_var(mean, std, alphas, holding_periods, rel_precision=0.01, initial_iterations=10000,
+                             max_iterations=10000000, growth=2, seed=None, sampler='paths', ladder=(), progress=None):
+    """VaR Monte Carlo dengan jumlah iterasi adaptif per sel (alpha, holding period).
+
+    Simulasi berjalan dalam batch yang membesar (x growth). Setiap sel berhenti sendiri begitu
+    setengah lebar interval kepercayaan 95% order statistic <= rel_precision x |VaR|; holding
+    period yang seluruh selnya sudah konvergen tidak disimulasikan lagi.
+
+    Mengembalikan dict berisi array (len(alphas), len(holding_periods)): 'var', 'es', 'lower', 'upper',
+    'iterations' (iterasi yang benar-benar dipakai), dan 'converged'; serta 'ladder' berukuran
+    (len(ladder), len(holding_periods)) dari simulasi yang sama, memakai iterasi terbanyak yang
+    disimulasikan untuk holding period itu. `progress` dipanggil setiap
+    batch seperti pada simulate_risk, dengan max_iterations sebagai total. max_iterations dibatasi
+    tail_iteration_limit agar buffer ekor muat dalam TAIL_BYTES.
+    """
+    if sampler not in ('paths', 'collapsed'):
+        raise ValueError("Mode adaptif hanya mendukung sampler 'paths' atau 'collapsed'")
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    model = NormalModel(mean, std, sampler)
+    # Buffer ekor dialokasikan untuk max_iterations; batasi agar tetap muat dalam TAIL_BYTES
+    tail_alphas = list(alphas) + list(ladder)
+    max_iterations = min(max_iterations, tail_iteration_limit(tail_alphas, len(holding_periods)))
+    chunk_size = min(model.chunk_size(holding_periods), initial_iterations)
+    tail_size = tail_size_for(tail_alphas, max_iterations)
+    seeds = chunk_seeds(seed, max_iterations, chunk_size)
+    buffer = TailBuffer(len(holding_periods), tail_size, chunk_size)
+
+    shape = (len(alphas), len(holding_periods))
+    result = {
+        'var': np.full(shape, np.nan),
+        'es': np.full(shape, np.nan),
+        'lower': np.full(shape, np.nan),
+        'upper': np.full(shape, np.nan),
+        'iterations': np.zeros(shape, dtype=np.int64),
+        'converged': np.zeros(shape, dtype=bool),
+    }
+
+    done = 0
+    target = min(initial_iterations, max_iterations)
+    next_chunk = 0
+    while True:
+        active = [j for j in range(len(holding_periods)) if not result['converged'][:, j].all()]
+        active_hps = [holding_periods[j] for j in active]
+        while done < target:
+            child, n = seeds[next_chunk]
+            rng = np.random.default_rng(child)
+            buffer.push(model.sample(active_hps, n, rng), rows=active)
+            done += n
+            next_chunk += 1
+
+        var = buffer.quantiles(alphas, done).T
+        es = buffer.expected_shortfall(alphas, done).T
+        lower, upper = buffer.order_stat_interval(alphas, done)
+        half_width = (upper.T - lower.T) / 2
+        for j in active:
+            for i in range(len(alphas)):
+                if result['converged'][i, j]:
+                    continue
+                result['var'][i, j] = var[i, j]
+                result['es'][i, j] = es[i, j]
+                result['lower'][i, j] = lower[j, i]
+                result['upper'][i, j] = upper[j, i]
+                result['iterations'][i, j] = done
+                result['converged'][i, j] = half_width[i, j] <= rel_precision * abs(var[i, j])
+
+        if result['converged'].all() or done >= max_iterations:
+            if len(ladder):
+                result['ladder'] = np.empty((len(ladder), len(holding_periods)))
+                for j in range(len(holding_periods)):
+                    n = result['iterations'][:, j].max()
+                    indices = [var_order_index(alpha, n) for alpha in ladder]
+                    result['ladder'][:, j] = buffer.order_statistics(indices)[j]
+            return result
+        if progress is not None:
+            progress(done, max_iterations, {'var': result['var'].copy(), 'iterations': done})
+        target = min(int(done * growth), max_iterations)
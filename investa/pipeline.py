@@ -0,0 +1,56 @@
+"""Alur perhitungan VaR lengkap (uji normalitas -> Monte Carlo / Cornish-Fisher) tanpa UI."""
+import pandas as pd
+
+from investa.cornish_fisher import cornish_fisher_es, cornish_fisher_var
+from investa.montecarlo import monte_carlo_risk
+from investa.returns import compute_returns
+from investa.statistics import describe_returns, normality_test
+
+PRESET_ALPHAS = [0.01, 0.05, 0.10]
+PRESET_HOLDING_PERIODS = [1, 5, 20]
+
+
+def analyze_returns(log_returns, alphas=PRESET_ALPHAS, holding_periods=PRESET_HOLDING_PERIODS, alpha_test=0.05,
+                    v0=100000000, iterations=10000, seed=None, sampler='paths'):
+    """Uji normalitas lalu hitung VaR seperti tab Perhitungan VaR.
+
+    Data normal memakai Monte Carlo Normal, selainnya Cornish-Fisher. Mengembalikan
+    (ringkasan statistik, DataFrame hasil VaR satu baris per alpha x holding period).
+    """
+    log_returns = log_returns.dropna()
+    test_name, _, p_value = normality_test(log_returns)
+    is_normal = p_value > alpha_test
+    desc = describe_returns(log_returns)
+
+    if is_normal:
+        method = 'Monte Carlo (Normal)'
+        risk = monte_carlo_risk(desc['mean'], desc['std'], alphas, holding_periods, iterations,
+                                seed=seed, sampler=sampler, stderr=False)
+        var_grid, es_grid = risk['var'], risk['es']
+    else:
+        method = 'Cornish-Fisher'
+        _, _, var_grid = cornish_fisher_var(desc['mean'], desc['std'], desc['skew'], desc['kurtosis'],
+                                            alphas, holding_periods)
+        es_grid = cornish_fisher_es(desc['mean'], desc['std'], desc['skew'], desc['kurtosis'],
+                                    alphas, holding_periods)
+
+    results = []
+    for i, alpha in enumerate(alphas):
+        for j, hp in enumerate(holding_periods):
+            results.append({
+                'Metode': method,
+                'Confidence Level': f"{int((1-alpha)*100)}%",
+                'Alpha': alpha,
+                'Holding Period': hp,
+                'VaR Value': var_grid[i, j],
+                'Kerugian Maksimal': abs(var_grid[i, j] * v0),
+                'Expected Shortfall': es_grid[i, j],
+                'ES Nominal': abs(es_grid[i, j] * v0)
+            })
+
+    summary = dict(desc, test_name=test_name, p_value=p_value, is_normal=is_normal)
+    return summary, pd.DataFrame(results)
+
+
+def analyze_prices(prices, **kwargs):
+    return analyze_returns(compute_returns(prices), **kwargs)
@@ -0,0 +1,38 @@
+"""Daftar preset saham populer."""
+
+# Daftar saham Indonesia
+STOCK_LIST_IDN = {
+    "ADRO": "Adaro Energy", "AKRA": "AKR Corporindo", "AMRT": "Sumber Alfaria Trijaya",
+    "ANTM": "Aneka Tambang", "ASII": "Astra International", "BBCA": "Bank Central Asia",
+    "BBNI": "Bank Negara Indonesia", "BBRI": "Bank Rakyat Indonesia", "BMRI": "Bank Mandiri",
+    "BRPT": "Barito Pacific", "CPIN": "Charoen Pokphand Indonesia", "EXCL": "XL Axiata",
+    "GOTO": "GoTo Gojek Tokopedia", "ICBP": "Indofood CBP", "INCO": "Vale Indonesia",
+    "INDF": "Indofood Sukses Makmur", "INKP": "Indah Kiat Pulp & Paper", "ISAT": "Indosat Ooredoo",
+    "ITMG": "Indo Tambangraya Megah", "JPFA": "Japfa Comfeed Indonesia", "KLBF": "Kalbe Farma",
+    "MBMA": "Marga Abhinaya Abadi", "MDKA": "Merdeka Copper Gold", "MEDC": "Medco Energi",
+    "PGAS": "Perusahaan Gas Negara", "PTBA": "Bukit Asam", "SMGR": "Semen Indonesia",
+    "TLKM": "Telkom Indonesia", "UNTR": "United Tractors", "UNVR": "Unilever Indonesia"
+}
+
+# Daftar saham internasional populer
+STOCK_LIST_INTL = {
+    "AAPL": "Apple Inc.", "MSFT": "Microsoft Corporation", "GOOGL": "Alphabet Inc. (Google)",
+    "AMZN": "Amazon.com Inc.", "TSLA": "Tesla Inc.", "META": "Meta Platforms (Facebook)",
+    "NVDA": "NVIDIA Corporation", "BRK-B": "Berkshire Hathaway", "JPM": "JPMorgan Chase",
+    "JNJ": "Johnson & Johnson", "V": "Visa Inc.", "PG": "Procter & Gamble",
+    "UNH": "UnitedHealth Group", "MA": "Mastercard", "HD": "Home Depot",
+    "DIS": "Walt Disney Company", "BAC": "Bank of America", "NFLX": "Netflix Inc.",
+    "ADBE": "Adobe Inc.", "CRM": "Salesforce Inc.", "CSCO": "Cisco Systems",
+    "INTC": "Intel Corporation", "PFE": "Pfizer Inc.", "KO": "Coca-Cola Company",
+    "PEP": "PepsiCo Inc.", "WMT": "Walmart Inc.", "NKE": "Nike Inc.",
+    "MRK": "Merck & Co.", "T": "AT&T Inc.", "VZ": "Verizon Communications"
+}
+
+
+def preset_tickers(market):
+    """Ticker Yahoo Finance untuk preset 'idn' (dengan akhiran .JK) atau 'intl'."""
+    if market == 'idn':
+        return [f"{code}.JK" for code in STOCK_LIST_IDN]
+    if market == 'intl':
+        return list(STOCK_LIST_INTL)
+    raise ValueError(f"Preset pasar tidak dikenal: {market}")
@@ -0,0 +1,273 @@
+"""Penyimpanan lokal harga saham dengan pengambilan data Yahoo Finance secara inkremental.
+
+Harga yang disimpan adalah harga yang sudah disesuaikan (auto_adjust yfinance) agar split dan
+dividen tidak muncul sebagai lonjakan return. Penyesuaian itu berubah mundur setiap ada aksi
+korporasi baru, jadi pengambilan bagian akhir selalu tumpang tindih dengan bar yang sudah
+tersimpan; bila harganya tidak lagi cocok, seluruh cache ticker itu diunduh ulang.
+"""
+import logging
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from investa.returns import compute_returns
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Tumpang tindih pengambilan bagian akhir dengan bar tersimpan, dan selisih relatif harga penutupan
+# di atas toleransi yang dianggap perubahan penyesuaian (dividen/split baru)
+ADJUSTMENT_OVERLAP = timedelta(days=7)
+ADJUSTMENT_TOLERANCE = 1e-6
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get('INVESTA_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'investa')),
+    'prices.sqlite'
+)
+
+
+class DownloadError(RuntimeError):
+    """Unduhan Yahoo Finance gagal (jaringan, rate limit, dsb.), bukan sekadar tanpa data."""
+
+
+class _ErrorCapture(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def yf_history(ticker, **kwargs):
+    """yf.download harga disesuaikan dengan kolom diratakan; melempar DownloadError bila unduhan gagal.
+
+    yf.download tidak melempar exception saat gagal, hanya mencatat "Failed download" ke logger
+    'yfinance' dan mengembalikan frame kosong, sehingga log itu ditangkap dan diperiksa per ticker.
+    """
+    import yfinance as yf
+
+    capture = _ErrorCapture()
+    yf_logger = logging.getLogger('yfinance')
+    yf_logger.addHandler(capture)
+    try:
+        data = yf.download(ticker, progress=False, auto_adjust=True, **kwargs)
+    finally:
+        yf_logger.removeHandler(capture)
+    errors = [message for message in capture.messages if repr(ticker) in message]
+    if data is None or data.empty:
+        if errors:
+            raise DownloadError(errors[-1])
+        return pd.DataFrame(columns=PRICE_COLUMNS)
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+    return data
+
+
+def yf_download(ticker, start, end):
+    """Downloader default: bar harian disesuaikan dengan kolom PRICE_COLUMNS."""
+    return yf_history(ticker, start=start, end=end)
+
+
+def _day(value):
+    return pd.Timestamp(value).normalize()
+
+
+def missing_ranges(coverage, start, end, now, max_age, overlap, resolution=_day):
+    """Rentang [start, end) yang perlu diunduh, dipakai bersama PriceStore dan IntradayStore.
+
+    `coverage` adalah (awal, akhir, fetched_at) rentang tersimpan atau None. Bar pada atau setelah
+    resolution(fetched_at) masih sementara dan diunduh ulang hanya setelah `max_age`. Kedua ujung
+    diambil tumpang tindih `overlap` dengan bar tersimpan untuk deteksi penyesuaian harga baru.
+    """
+    if coverage is None:
+        return [(start, end)]
+    cov_start, cov_end, fetched_at = coverage
+    ranges = []
+    if start < cov_start:
+        ranges.append((start, min(cov_end, cov_start + overlap)))
+    if end > cov_end:
+        # Bar terakhir masih sementara: unduh ulang hanya jika cache sudah melewati max_age
+        provisional_only = cov_end >= resolution(fetched_at)
+        if not provisional_only or now - fetched_at > max_age:
+            # Mulai sebelum cov_end agar bar tersimpan bisa dibandingkan (deteksi penyesuaian baru)
+            ranges.append((max(cov_start, _day(cov_end) - overlap), end))
+    return ranges
+
+
+def merge_coverage(coverage, start, end, fetched_at, resolution=_day):
+    """Cakupan baru (awal, akhir, fetched_at) setelah [start, end) berhasil diunduh pada fetched_at.
+
+    Hanya dipanggil setelah unduhan berhasil, sehingga unduhan gagal tidak pernah menambah cakupan.
+    """
+    # Bar pada atau setelah waktu pengambilan belum final, jadi tidak ditandai tercakup
+    covered_end = min(end, resolution(fetched_at))
+    new_start, new_end = start, max(covered_end, start)
+    if coverage is not None:
+        # Pengambilan bagian awal tidak memperbarui umur bar terakhir
+        if end < coverage[1]:
+            fetched_at = coverage[2]
+        new_start, new_end = min(new_start, coverage[0]), max(new_end, coverage[1])
+    return new_start, new_end, fetched_at
+
+
+def adjustment_changed(stored_close, fetched_close, tolerance=ADJUSTMENT_TOLERANCE):
+    """True bila harga penutupan tersimpan dan hasil unduhan pada waktu yang sama berbeda melebihi tolerance."""
+    common = stored_close.index.intersection(fetched_close.index)
+    if common.empty:
+        return False
+    ratio = fetched_close[common].to_numpy(dtype=float) / stored_close[common].to_numpy(dtype=float)
+    return bool(np.any(np.abs(ratio - 1) > tolerance))
+
+
+class PriceStore:
+    """Cache harga harian per ticker di SQLite.
+
+    Rentang tanggal yang sudah tersimpan dicatat per ticker, sehingga permintaan berikutnya
+    hanya mengunduh bagian awal/akhir yang belum ada. Bar yang jatuh pada atau setelah tanggal
+    pengambilan dianggap sementara dan diunduh ulang setelah `max_age`.
+
+    `downloader` adalah callable (ticker, start, end) -> DataFrame ber-index tanggal dengan
+    kolom PRICE_COLUMNS; ganti dengan downloader palsu untuk penggunaan offline. Downloader
+    harus melempar exception bila unduhan gagal: frame kosong berarti memang tidak ada bar, dan
+    rentangnya dicatat tercakup.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, downloader=yf_download, max_age=timedelta(minutes=15),
+                 now=datetime.now):
+        self.path = path
+        self.downloader = downloader
+        self.max_age = max_age
+        self.now = now
+        self._lock = threading.Lock()
+        self._ticker_locks = defaultdict(threading.Lock)
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._memory_lock = threading.RLock()
+        self._memory_conn = sqlite3.connect(path, check_same_thread=False) if path == ':memory:' else None
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS prices (ticker TEXT, date TEXT, open REAL, high REAL, "
+                "low REAL, close REAL, volume REAL, PRIMARY KEY (ticker, date))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS coverage (ticker TEXT PRIMARY KEY, start TEXT, end TEXT, "
+                "fetched_at TEXT)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        if self._memory_conn is not None:
+            # Satu koneksi in-memory dipakai bersama, jadi akses antar-thread harus bergantian
+            with self._memory_lock, self._memory_conn as conn:
+                yield conn
+            return
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, ticker, start, end):
+        """Ambil bar harian [start, end) untuk ticker, mengunduh hanya rentang yang belum tersimpan."""
+        start, end = _day(start), _day(end)
+        with self._lock:
+            ticker_lock = self._ticker_locks[ticker]
+        with ticker_lock:
+            for fetch_start, fetch_end in self._missing_ranges(ticker, start, end):
+                self._fetch(ticker, fetch_start, fetch_end)
+        return self._read(ticker, start, end)
+
+    def get_many(self, tickers, start, end, max_workers=8):
+        """Ambil banyak ticker sekaligus dengan thread pool terbatas; hasil berupa dict ticker -> DataFrame.
+
+        Ticker yang unduhannya gagal menghasilkan frame kosong (dan dicoba lagi pada permintaan berikutnya).
+        """
+        def get_one(ticker):
+            try:
+                return self.get(ticker, start, end)
+            except DownloadError as e:
+                logger.warning("Gagal mengunduh %s: %s", ticker, e)
+                return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name='Date'))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(zip(tickers, pool.map(get_one, tickers)))
+
+    def _coverage(self, ticker):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT start, end, fetched_at FROM coverage WHERE ticker = ?", (ticker,)
+            ).fetchone()
+        if row is None:
+            return None
+        return _day(row[0]), _day(row[1]), datetime.fromisoformat(row[2])
+
+    def _missing_ranges(self, ticker, start, end):
+        return missing_ranges(self._coverage(ticker), start, end, self.now(), self.max_age, ADJUSTMENT_OVERLAP)
+
+    def _fetch(self, ticker, start, end):
+        # Exception dari downloader diteruskan sebelum apa pun ditulis, jadi cakupan tidak bertambah
+        data = self.downloader(ticker, start, end)
+        coverage = self._coverage(ticker)
+        if coverage is not None and self._adjustment_changed(ticker, data, start, min(end, coverage[1])):
+            # Harga tersimpan memakai penyesuaian lama: buang dan unduh ulang seluruh rentang
+            with self._connect() as conn:
+                conn.execute("DELETE FROM prices WHERE ticker = ?", (ticker,))
+                conn.execute("DELETE FROM coverage WHERE ticker = ?", (ticker,))
+            start, end = min(start, coverage[0]), max(end, coverage[1])
+            data = self.downloader(ticker, start, end)
+        fetched_at = self.now()
+        coverage = self._coverage(ticker)
+        if coverage is None and (data is None or data.empty):
+            # Ticker tidak dikenal/tanpa data: jangan dicatat agar bisa dicoba lagi
+            return
+        with self._connect() as conn:
+            if data is not None and not data.empty:
+                data = data[PRICE_COLUMNS]
+                conn.executemany(
+                    "INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(ticker, _day(date).strftime('%Y-%m-%d'), *map(float, row))
+                     for date, row in zip(data.index, data.itertuples(index=False))]
+                )
+            new_start, new_end, fetched_at = merge_coverage(coverage, start, end, fetched_at)
+            conn.execute(
+                "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)",
+                (ticker, new_start.strftime('%Y-%m-%d'), new_end.strftime('%Y-%m-%d'), fetched_at.isoformat())
+            )
+
+    def _adjustment_changed(self, ticker, data, start, end):
+        if data is None or data.empty or start >= end:
+            return False
+        fetched = pd.Series(data['Close'].to_numpy(dtype=float),
+                            index=pd.DatetimeIndex([_day(date) for date in data.index]))
+        return adjustment_changed(self._read(ticker, start, end)['Close'], fetched)
+
+    def _read(self, ticker, start, end):
+        with self._connect() as conn:
+            data = pd.read_sql_query(
+                "SELECT date, open, high, low, close, volume FROM prices "
+                "WHERE ticker = ? AND date >= ? AND date < ? ORDER BY date",
+                conn, params=(ticker, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+            )
+        data.columns = ['Date'] + PRICE_COLUMNS
+        data['Date'] = pd.to_datetime(data['Date'])
+        return data.set_index('Date')
+
+
+def wide_prices(frames, column='Close'):
+    """Gabungkan harga banyak ticker menjadi satu frame lebar pada index tanggal bersama."""
+    wide = pd.concat({ticker: data[column] for ticker, data in frames.items() if not data.empty}, axis=1)
+    return wide.sort_index()
+
+
+def wide_log_returns(wide):
+    return compute_returns(wide).iloc[1:]
@@ -0,0 +1,92 @@
+"""Cache hasil perhitungan VaR lintas sesi dan restart aplikasi, disimpan di SQLite dengan batas LRU.
+
+Kunci adalah hash isi data dan parameter perhitungan (lihat jobs.job_key); hasil disimpan dalam
+satuan return sehingga nilai V0 berbeda cukup dilayani dengan penskalaan. Entri yang paling lama
+tidak diakses dibuang begitu jumlah entri atau total ukurannya melewati batas.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from investa.prices import DEFAULT_CACHE_PATH
+
+DEFAULT_RESULT_CACHE_PATH = os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), 'results.sqlite')
+
+# Naikkan bila format hasil berubah agar entri lama tidak terbaca
+RESULT_CACHE_VERSION = 2
+
+
+class ResultCache:
+    """Cache key -> hasil (objek yang bisa di-pickle) dengan batas jumlah entri dan ukuran total (byte)."""
+
+    def __init__(self, path=DEFAULT_RESULT_CACHE_PATH, max_entries=512, max_bytes=256 * 2**20):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._memory_conn = sqlite3.connect(path, check_same_thread=False) if path == ':memory:' else None
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, version INTEGER, value BLOB, "
+                "size INTEGER, created_at REAL, accessed_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+
+    @contextmanager
+    def _connect(self):
+        if self._memory_conn is not None:
+            with self._lock, self._memory_conn as conn:
+                yield conn
+            return
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """Hasil tersimpan untuk key, atau None; akses memperbarui urutan LRU."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM results WHERE key = ? AND version = ?",
+                               (key, RESULT_CACHE_VERSION)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(row[0])
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                         (key, RESULT_CACHE_VERSION, blob, len(blob), now, now))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed_at"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM results WHERE key = ?", stale)
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results")
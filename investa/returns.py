@@ -0,0 +1,18 @@
+"""Perhitungan return harga saham secara vektor."""
+import numpy as np
+
+
+def compute_returns(prices, kind='log'):
+    """Hitung return dari Series/DataFrame harga.
+
+    kind='log' menghasilkan Ln(Pt / Pt-1), kind='simple' menghasilkan Pt / Pt-1 - 1.
+    Harga nol/negatif diperlakukan sebagai data hilang, dan return yang bersebelahan dengan
+    data hilang bernilai NaN (tidak diisi maju).
+    """
+    prices = prices.astype(float)
+    prices = prices.where(prices > 0)
+    if kind == 'log':
+        return np.log(prices).diff()
+    if kind == 'simple':
+        return prices / prices.shift(1) - 1
+    raise ValueError(f"Jenis return tidak dikenal: {kind}")
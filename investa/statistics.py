@@ -0,0 +1,115 @@
+"""Statistik deskriptif dan uji normalitas log return, untuk satu saham atau banyak saham sekaligus."""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Batas jumlah data: di atas ini memakai Kolmogorov-Smirnov, selebihnya Shapiro-Wilk
+KS_MIN_SAMPLES = 50
+
+# Jumlah data minimum untuk uji normalitas (batas bawah Shapiro-Wilk)
+MIN_SAMPLES = 3
+
+
+def normality_test(log_returns):
+    """Uji normalitas log return; mengembalikan (nama uji, statistik, p-value)."""
+    if len(log_returns) > KS_MIN_SAMPLES:
+        stat, p_value = stats.kstest(log_returns, 'norm', args=(log_returns.mean(), log_returns.std()))
+        return "Kolmogorov-Smirnov", stat, p_value
+    stat, p_value = stats.shapiro(log_returns)
+    return "Shapiro-Wilk", stat, p_value
+
+
+def describe_returns(log_returns):
+    """Momen dan ringkasan log return yang dipakai di tab Uji Normalitas dan VaR."""
+    return {
+        'mean': log_returns.mean(),
+        'std': log_returns.std(),
+        'median': log_returns.median(),
+        'var': log_returns.var(),
+        'skew': stats.skew(log_returns),
+        'kurtosis': stats.kurtosis(log_returns),
+        'min': log_returns.min(),
+        'max': log_returns.max(),
+        'count': len(log_returns),
+    }
+
+
+def describe_returns_wide(wide):
+    """describe_returns untuk setiap kolom frame lebar (kolom = ticker) dalam satu pass NumPy.
+
+    NaN diabaikan per kolom, sehingga ticker dengan riwayat berbeda panjang tetap bisa digabung.
+    Hasilnya sama dengan describe_returns(wide[kolom].dropna()); satu baris per ticker.
+    """
+    x = wide.to_numpy(dtype=float)
+    valid = ~np.isnan(x)
+    count = valid.sum(axis=0)
+    median = np.full(x.shape[1], np.nan)
+    median[count > 0] = np.nanmedian(x[:, count > 0], axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(valid, x, 0.0).sum(axis=0) / count
+        deviation = np.where(valid, x - mean, 0.0)
+        m2 = (deviation ** 2).sum(axis=0) / count
+        m3 = (deviation ** 3).sum(axis=0) / count
+        m4 = (deviation ** 4).sum(axis=0) / count
+        var = m2 * count / (count - 1)
+        moments = {
+            'mean': mean,
+            'std': np.sqrt(var),
+            'median': median,
+            'var': var,
+            # Sama dengan scipy.stats.skew / kurtosis (bias=True, kurtosis excess)
+            'skew': m3 / m2 ** 1.5,
+            'kurtosis': m4 / m2 ** 2 - 3.0,
+            'min': np.where(valid, x, np.inf).min(axis=0, initial=np.inf),
+            'max': np.where(valid, x, -np.inf).max(axis=0, initial=-np.inf),
+            'count': count,
+        }
+    frame = pd.DataFrame(moments, index=wide.columns)
+    frame.loc[frame['count'] == 0, ['min', 'max']] = np.nan
+    return frame
+
+
+def normality_tests_wide(wide, workers=None):
+    """Uji normalitas dan momen seluruh ticker, tanpa keputusan normal/tidak.
+
+    Uji per ticker dipilih dari jumlah datanya (normality_test) dan dijalankan paralel di thread
+    pool. Hasilnya tidak bergantung pada alpha_test sehingga bisa di-cache lalu diarahkan dengan
+    route_screen. Ticker dengan kurang dari MIN_SAMPLES data tidak diuji (p-value kosong).
+    """
+    moments = describe_returns_wide(wide)
+    testable = [col for col in wide.columns if moments.at[col, 'count'] >= MIN_SAMPLES]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        tests = dict(zip(testable, executor.map(lambda col: normality_test(wide[col].dropna()), testable)))
+    screen = pd.DataFrame({
+        'Jumlah Data': moments['count'],
+        'Metode Uji': [tests[col][0] if col in tests else None for col in wide.columns],
+        'Statistik Uji': [tests[col][1] if col in tests else np.nan for col in wide.columns],
+        'P-Value': [tests[col][2] if col in tests else np.nan for col in wide.columns],
+    }, index=wide.columns)
+    return screen.join(moments.drop(columns='count'))
+
+
+def route_screen(tests, alpha_test=0.05):
+    """Tambahkan kolom 'Normal' dan 'Metode VaR' ke hasil normality_tests_wide.
+
+    Aturannya sama dengan tab Uji Normalitas: normal bila p-value > alpha_test lalu diarahkan ke
+    Monte Carlo (Normal); selainnya ke Cornish-Fisher. Ticker tanpa p-value tidak diberi metode.
+    """
+    screen = tests.copy()
+    screen['Normal'] = screen['P-Value'] > alpha_test
+    screen['Metode VaR'] = np.where(screen['Normal'], 'Monte Carlo (Normal)', 'Cornish-Fisher')
+    screen.loc[screen['P-Value'].isna(), 'Metode VaR'] = None
+    # Kolom keputusan tepat setelah P-Value, sebelum momen
+    position = list(tests.columns).index('P-Value') + 1
+    return screen[list(tests.columns[:position]) + ['Normal', 'Metode VaR'] + list(tests.columns[position:])]
+
+
+def normality_screen(wide, alpha_test=0.05, workers=None):
+    """Uji normalitas dan momen seluruh ticker sekaligus, serta metode VaR yang dipakai tiap ticker.
+
+    Gabungan normality_tests_wide dan route_screen.
+    """
+    return route_screen(normality_tests_wide(wide, workers), alpha_test)
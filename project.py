@@ -1,10 +1,30 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from scipy import stats
 from datetime import datetime, timedelta
 import io
+import os
+import uuid
+from functools import partial
+
+from investa.backtest import backtest_var
+from investa.compact import SESSION_MEMORY_BUDGET, CompactReturns, compact_frame, session_memory
+from investa.cornish_fisher import cornish_fisher_es, cornish_fisher_grid, cornish_fisher_slope, cornish_fisher_var
+from investa.export import EXPORT_FORMATS, export_bytes, export_target
+from investa.historical import HistoricalIndex, build_historical_indexes
+from investa.instrumentation import PerfRecorder, configure_json_log
+from investa.intraday import IntradayStore, load_bars
+from investa.jobs import CANCELLED, FAILED, JobManager, job_key
+from investa.loaders import DATE_COLUMN_NAMES, UPLOAD_TYPES, find_column, load_price_file
+from investa.models import fit_model
+from investa.montecarlo import TAIL_BYTES, Z_95, adaptive_monte_carlo_var, monte_carlo_risk, parametric_var, simulate_risk
+from investa.portfolio import portfolio_var
+from investa.presets import STOCK_LIST_IDN, STOCK_LIST_INTL, preset_tickers
+from investa.prices import PriceStore, wide_log_returns, wide_prices
+from investa.result_cache import ResultCache
+from investa.returns import compute_returns
+from investa.statistics import describe_returns, normality_test, normality_tests_wide, route_screen
 
 st.set_page_config(page_title="INVESTA", page_icon="📊", layout="wide")
 
@@ -22,34 +42,232 @@ st.markdown("""
 st.markdown('<p class="main-header">📊 INVESTA</p>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Aplikasi Manajemen Risiko dengan Monte Carlo & Cornish-Fisher Expansion</p>', unsafe_allow_html=True)
 
-# Daftar saham Indonesia
-STOCK_LIST_IDN = {
-    "ADRO": "Adaro Energy", "AKRA": "AKR Corporindo", "AMRT": "Sumber Alfaria Trijaya",
-    "ANTM": "Aneka Tambang", "ASII": "Astra International", "BBCA": "Bank Central Asia",
-    "BBNI": "Bank Negara Indonesia", "BBRI": "Bank Rakyat Indonesia", "BMRI": "Bank Mandiri",
-    "BRPT": "Barito Pacific", "CPIN": "Charoen Pokphand Indonesia", "EXCL": "XL Axiata",
-    "GOTO": "GoTo Gojek Tokopedia", "ICBP": "Indofood CBP", "INCO": "Vale Indonesia",
-    "INDF": "Indofood Sukses Makmur", "INKP": "Indah Kiat Pulp & Paper", "ISAT": "Indosat Ooredoo",
-    "ITMG": "Indo Tambangraya Megah", "JPFA": "Japfa Comfeed Indonesia", "KLBF": "Kalbe Farma",
-    "MBMA": "Marga Abhinaya Abadi", "MDKA": "Merdeka Copper Gold", "MEDC": "Medco Energi",
-    "PGAS": "Perusahaan Gas Negara", "PTBA": "Bukit Asam", "SMGR": "Semen Indonesia",
-    "TLKM": "Telkom Indonesia", "UNTR": "United Tractors", "UNVR": "Unilever Indonesia"
+# Instrumentasi performa: nonaktif secara default, aktifkan dari sidebar atau env INVESTA_PERF=1
+with st.sidebar:
+    st.subheader("⏱️ Performance")
+    perf_enabled = st.checkbox("Aktifkan instrumentasi", value=os.environ.get('INVESTA_PERF') == '1')
+    perf_profile = st.checkbox("Rekam cProfile", value=False, disabled=not perf_enabled)
+    perf_memory = st.checkbox("Ukur puncak memori", value=False, disabled=not perf_enabled)
+session_id = st.session_state.setdefault('perf_session', uuid.uuid4().hex[:12])
+perf = PerfRecorder(perf_enabled, profile=perf_profile, memory=perf_memory, context={'session': session_id})
+# Perekam untuk pekerjaan di luar eksekusi skrip ini (job VaR di thread latar, ekspor saat tombol unduh
+# diklik); record yang sudah selesai digabung ke panel Performance pada eksekusi berikutnya
+deferred_perf = st.session_state.setdefault('perf_deferred', {})
+deferred_perf.setdefault('export', PerfRecorder(context=perf.context)).enabled = perf_enabled
+
+# Mode memori hemat: data sesi disimpan sebagai array ringkas (float32 bila presisinya cukup)
+with st.sidebar:
+    st.subheader("💾 Memori Sesi")
+    compact_mode = st.checkbox("Mode memori hemat", value=os.environ.get('INVESTA_COMPACT') == '1',
+                               help="Simpan log return sebagai array ringkas dengan momen yang sudah dihitung, "
+                                    "tanpa menyimpan tabel upload lengkap di sesi")
+
+# Metode perhitungan VaR untuk data berdistribusi normal
+SIMULATION_METHODS = {
+    "Monte Carlo (Normal)": 'paths',
+    "Monte Carlo (Satu Draw per Jalur)": 'collapsed',
+    "Quasi-Monte Carlo (Sobol)": 'qmc',
+    "Parametrik (Closed-Form)": 'parametric'
+}
+
+# Metode perhitungan VaR untuk data tidak berdistribusi normal (None = Cornish-Fisher closed-form)
+NON_NORMAL_METHODS = {
+    "Cornish-Fisher Expansion": None,
+    "Monte Carlo Student-t": 'student_t',
+    "Bootstrap Historis": 'bootstrap',
+    "GARCH(1,1)": 'garch',
+    "GARCH(1,1) + Filtered Bootstrap": 'filtered_garch'
+}
+
+# Interval data tab1 ('1d' memakai cache harian PriceStore, selainnya bar intraday)
+DATA_INTERVALS = {
+    "Harian (1d)": '1d',
+    "1 jam (1h)": '1h',
+    "30 menit (30m)": '30m',
+    "15 menit (15m)": '15m',
+    "5 menit (5m)": '5m',
+    "1 menit (1m)": '1m'
 }
 
-# Daftar saham internasional populer
-STOCK_LIST_INTL = {
-    "AAPL": "Apple Inc.", "MSFT": "Microsoft Corporation", "GOOGL": "Alphabet Inc. (Google)",
-    "AMZN": "Amazon.com Inc.", "TSLA": "Tesla Inc.", "META": "Meta Platforms (Facebook)",
-    "NVDA": "NVIDIA Corporation", "BRK-B": "Berkshire Hathaway", "JPM": "JPMorgan Chase",
-    "JNJ": "Johnson & Johnson", "V": "Visa Inc.", "PG": "Procter & Gamble",
-    "UNH": "UnitedHealth Group", "MA": "Mastercard", "HD": "Home Depot",
-    "DIS": "Walt Disney Company", "BAC": "Bank of America", "NFLX": "Netflix Inc.",
-    "ADBE": "Adobe Inc.", "CRM": "Salesforce Inc.", "CSCO": "Cisco Systems",
-    "INTC": "Intel Corporation", "PFE": "Pfizer Inc.", "KO": "Coca-Cola Company",
-    "PEP": "PepsiCo Inc.", "WMT": "Walmart Inc.", "NKE": "Nike Inc.",
-    "MRK": "Merck & Co.", "T": "AT&T Inc.", "VZ": "Verizon Communications"
+# Horizon resample bar intraday (None = tanpa resample, holding period dihitung per bar)
+RESAMPLE_RULES = {
+    "Harian (1 hari)": '1D',
+    "1 jam": '1h',
+    "30 menit": '30min',
+    "15 menit": '15min',
+    "5 menit": '5min',
+    "Tanpa resample (per bar)": None
 }
 
+# Tangga quantile ekor (alpha) dan jumlah bin histogram ekor pada hasil VaR
+TAIL_LADDER = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.10]
+TAIL_BINS = 50
+TAIL_MEMORY_HELP = (f"Memori tetap terbatas: bila ekor simulasi melebihi {TAIL_BYTES // 2**20} MB, "
+                    "VaR dihitung dua lintasan (chunk disimulasikan ulang) sehingga waktu hitung bertambah")
+
+@st.cache_resource
+def get_perf_log():
+    # Log JSON per tahap ke stderr, atau ke file bila INVESTA_PERF_LOG diisi
+    return configure_json_log(os.environ.get('INVESTA_PERF_LOG'))
+
+
+@st.cache_resource
+def get_job_manager():
+    # Satu pool job untuk semua sesi, sehingga permintaan identik dapat memakai job yang sama;
+    # hasil yang selesai juga disimpan di cache SQLite yang bertahan setelah aplikasi di-restart
+    return JobManager(max_workers=max(2, os.cpu_count() or 1), cache=ResultCache())
+
+
+@st.cache_resource
+def get_price_store():
+    return PriceStore()
+
+
+@st.cache_resource
+def get_intraday_store():
+    return IntradayStore()
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def get_historical_index(log_returns):
+    # Indeks prefix sum per data; ekor yang sudah diurutkan ikut tersimpan antar rerun
+    return HistoricalIndex(log_returns)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_historical_indexes(wide_returns):
+    return build_historical_indexes(wide_returns)
+
+
+@st.cache_data(max_entries=16, ttl=3600, show_spinner=False)
+def load_uploaded_prices(file_bytes, filename, float32):
+    df, close_col = load_price_file(io.BytesIO(file_bytes), filename, float32=float32)
+    if close_col is not None:
+        # Hitung Log Return: Ln(Pt / Pt-1)
+        df['Log Return'] = compute_returns(df[close_col])
+    return df, close_col
+
+
+@st.cache_data(max_entries=64, ttl=3600, show_spinner=False)
+def cached_normality_test(log_returns):
+    return normality_test(log_returns)
+
+
+@st.cache_data(max_entries=64, ttl=3600, show_spinner=False)
+def cached_describe_returns(log_returns):
+    return describe_returns(log_returns)
+
+
+@st.cache_data(max_entries=16, ttl=3600, show_spinner=False)
+def cached_normality_tests(wide_returns):
+    # Uji dan momen saja; alpha_test diterapkan di luar cache lewat route_screen
+    return normality_tests_wide(wide_returns)
+
+
+if perf.enabled:
+    get_perf_log()
+
+# Kunci session state yang berisi data (dipakai untuk mengukur anggaran memori per sesi)
+SESSION_DATA_KEYS = ['uploaded_data', 'log_returns', 'downloaded_data', 'batch_prices', 'batch_log_returns']
+
+
+def show_session_memory():
+    """Ukuran data sesi dibandingkan anggaran SESSION_MEMORY_BUDGET."""
+    sizes = session_memory(st.session_state, SESSION_DATA_KEYS)
+    total = sum(sizes.values())
+    detail = ", ".join(f"{key} {size / 2**20:.2f} MB" for key, size in sizes.items())
+    st.caption(f"💾 Memori data sesi: {total / 2**20:.2f} MB dari anggaran {SESSION_MEMORY_BUDGET / 2**20:.0f} MB"
+               + (f" ({detail})" if detail else ""))
+    if total > SESSION_MEMORY_BUDGET:
+        st.warning("⚠️ Data sesi melebihi anggaran memori; aktifkan **Mode memori hemat** di sidebar")
+
+
+def compute_var(request, log_returns, workers=1, perf=None, progress=None):
+    """Hitung grid VaR/ES untuk satu permintaan tab3; dijalankan sebagai job latar belakang."""
+    alphas, holding_periods = request['alphas'], request['holding_periods']
+    moments = request['return_stats']
+    mean_return, std_return = moments['mean'], moments['std']
+    result = {'stderr': None, 'histogram': None, 'adaptive': None, 'cf_valid': None}
+    perf = perf or PerfRecorder()
+    with perf.stage('simulation', method=request['simulation_method'], iterations=request['iterations']):
+        if request['is_normal'] and request['sampler'] == 'parametric':
+            result['var'] = parametric_var(mean_return, std_return, alphas, holding_periods)
+            result['es'] = cornish_fisher_es(mean_return, std_return, 0, 0, alphas, holding_periods)
+            result['stderr'] = np.zeros_like(result['var'])
+            result['ladder'] = parametric_var(mean_return, std_return, TAIL_LADDER, holding_periods)
+        elif request['is_normal'] and request['adaptive']:
+            adaptive_result = adaptive_monte_carlo_var(
+                mean_return, std_return, alphas, holding_periods,
+                rel_precision=request['target_precision'] / 100,
+                initial_iterations=min(10000, request['iterations']),
+                max_iterations=request['iterations'], seed=request['seed'], sampler=request['sampler'],
+                ladder=TAIL_LADDER, progress=progress
+            )
+            result.update(var=adaptive_result['var'], es=adaptive_result['es'], adaptive=adaptive_result,
+                          stderr=(adaptive_result['upper'] - adaptive_result['lower']) / (2 * Z_95),
+                          ladder=adaptive_result['ladder'])
+        elif request['is_normal'] or request['model_name'] is not None:
+            # VaR, ES, tangga quantile dan histogram ekor dari satu simulasi yang sama
+            if request['is_normal']:
+                risk = monte_carlo_risk(
+                    mean_return, std_return, alphas, holding_periods, request['iterations'], sampler=request['sampler'],
+                    seed=request['seed'], workers=workers, ladder=TAIL_LADDER, bins=TAIL_BINS, progress=progress
+                )
+            else:
+                # Simulasi berekor tebal: model diestimasi dari log return historis
+                model = fit_model(request['model_name'], log_returns.dropna().to_numpy())
+                risk = simulate_risk(model, alphas, holding_periods, request['iterations'], seed=request['seed'],
+                                     workers=workers, ladder=TAIL_LADDER, bins=TAIL_BINS, progress=progress)
+            result.update(risk)
+        else:
+            # Cornish-Fisher Expansion
+            skewness, kurtosis = moments['skew'], moments['kurtosis']
+            z_alpha, z_cf, result['var'] = cornish_fisher_var(mean_return, std_return, skewness, kurtosis,
+                                                              alphas, holding_periods)
+            result.update(z_alpha=z_alpha, z_cf=z_cf,
+                          cf_valid=cornish_fisher_slope(z_alpha[:, 0], skewness, kurtosis) > 0,
+                          es=cornish_fisher_es(mean_return, std_return, skewness, kurtosis, alphas, holding_periods))
+            _, result['ladder'], _ = cornish_fisher_grid(mean_return, std_return, skewness, kurtosis,
+                                                         TAIL_LADDER, holding_periods, monotone=False)
+    return result
+
+
+@st.fragment(run_every=1)
+def show_var_progress(job, request):
+    """Panel progres job VaR yang diperbarui setiap detik tanpa menjalankan ulang seluruh halaman."""
+    if job.finished:
+        st.rerun()
+    st.progress(job.progress, text=f"Menghitung VaR... {job.progress:.0%} ({job.elapsed:.1f} s)")
+    if job.partial is not None:
+        st.caption(f"Hasil sementara dari {job.partial['iterations']:,} iterasi")
+        st.dataframe(pd.DataFrame(job.partial['var'], columns=[f"{hp} hari" for hp in request['holding_periods']],
+                                  index=[f"{int((1-alpha)*100)}%" for alpha in request['alphas']]),
+                     use_container_width=True)
+    if st.button("⏹️ Batalkan Perhitungan", key="cancel_var_job"):
+        job.cancel()
+
+
+def timed_export(sheets, fmt, recorder):
+    with recorder.stage('export', format=fmt, sheets=len(sheets)):
+        return export_bytes(sheets, fmt)
+
+
+def download_buttons(sheets, basename, key, label="💾 Download"):
+    """Tombol unduh Excel/Parquet/CSV; file baru dibuat saat tombol diklik, bukan di setiap rerun."""
+    for col, (fmt, (format_label, _)) in zip(st.columns(len(EXPORT_FORMATS)), EXPORT_FORMATS.items()):
+        file_name, mime = export_target(basename, fmt, len(sheets))
+        with col:
+            st.download_button(
+                label=f"{label} ({format_label})",
+                data=partial(timed_export, sheets, fmt, deferred_perf['export']),
+                file_name=file_name,
+                mime=mime,
+                on_click='ignore',
+                key=f"{key}_{fmt}",
+                use_container_width=True
+            )
+
+
 tab1, tab2, tab3 = st.tabs(["📥 Download Data Saham", "📤 Upload & Uji Normalitas", "📊 Perhitungan VaR"])
 
 with tab1:
@@ -76,7 +294,7 @@ with tab1:
     # Pilihan mode input
     input_mode = st.radio(
         "Pilih Mode Input",
-        ["📋 Pilih dari Daftar Preset", "✍️ Input Manual Ticker"],
+        ["📋 Pilih dari Daftar Preset", "✍️ Input Manual Ticker", "📚 Seluruh Daftar Preset"],
         horizontal=True
     )
     
@@ -102,7 +320,7 @@ with tab1:
                 )
                 ticker_symbol = selected_stock
                 stock_name = STOCK_LIST_INTL[selected_stock]
-        else:
+        elif input_mode == "✍️ Input Manual Ticker":
             if market_type == "🇮🇩 Saham Indonesia (IDX)":
                 manual_ticker = st.text_input(
                     "Masukkan Kode Saham Indonesia (tanpa .JK)",
@@ -123,6 +341,12 @@ with tab1:
                 stock_name = manual_ticker
                 
                 st.info(f"📊 Ticker yang akan diunduh: **{ticker_symbol}**")
+        else:
+            batch_tickers = preset_tickers('idn' if market_type == "🇮🇩 Saham Indonesia (IDX)" else 'intl')
+            ticker_symbol = ", ".join(batch_tickers)
+            stock_name = "Daftar Preset"
+
+            st.info(f"📊 {len(batch_tickers)} ticker akan diunduh sekaligus")
         
         start_date = st.date_input("Tanggal Mulai", value=datetime.now() - timedelta(days=365))
     
@@ -130,15 +354,78 @@ with tab1:
         st.write("")
         st.write("")
         end_date = st.date_input("Tanggal Akhir", value=datetime.now())
+
+    data_interval, resample_rule = '1d', None
+    if input_mode != "📚 Seluruh Daftar Preset":
+        col1, col2 = st.columns(2)
+        with col1:
+            data_interval = DATA_INTERVALS[st.selectbox("Interval Data", options=list(DATA_INTERVALS))]
+        if data_interval != '1d':
+            with col2:
+                resample_label = st.selectbox("Resample Bar Intraday ke", options=list(RESAMPLE_RULES))
+                resample_rule = RESAMPLE_RULES[resample_label]
+            earliest = get_intraday_store().earliest(data_interval)
+            if pd.Timestamp(start_date) < earliest:
+                st.info(f"ℹ️ Yahoo Finance hanya menyediakan data {data_interval} sejak {earliest:%Y-%m-%d}; "
+                        "periode sebelumnya dilewati")
+            if resample_rule != '1D':
+                st.warning("⚠️ Tanpa resample harian, holding period di Tab 3 berarti jumlah bar, bukan hari")
     
-    if st.button("📥 Lihat dan Download Data Saham", type="primary", use_container_width=True):
+    if input_mode == "📚 Seluruh Daftar Preset":
+        if st.button("📥 Download Seluruh Daftar Preset", type="primary", use_container_width=True):
+            try:
+                with st.spinner(f'Mengunduh data {len(batch_tickers)} saham...'):
+                    with perf.stage('download', tickers=len(batch_tickers)):
+                        frames = get_price_store().get_many(batch_tickers, start_date, end_date)
+                    missing = [ticker for ticker, data in frames.items() if data.empty]
+                    if len(missing) == len(frames):
+                        st.error("❌ Data tidak ditemukan untuk seluruh ticker pada periode yang dipilih")
+                    else:
+                        with perf.stage('returns'):
+                            wide_close = wide_prices(frames)
+                            wide_returns = wide_log_returns(wide_close)
+
+                        if compact_mode:
+                            wide_close, wide_returns = compact_frame(wide_close), compact_frame(wide_returns)
+                        st.session_state['batch_prices'] = wide_close
+                        st.session_state['batch_log_returns'] = wide_returns
+
+                        st.markdown(f"""
+                        <div class="success-box">
+                            <h3>✅ Data Berhasil Diunduh!</h3>
+                            <p><strong>Jumlah Saham:</strong> {wide_close.shape[1]} dari {len(frames)} ticker</p>
+                            <p><strong>Periode:</strong> {start_date} s/d {end_date}</p>
+                            <p><strong>Total Data:</strong> {len(wide_close)} baris</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                        if missing:
+                            st.warning("⚠️ Data tidak ditemukan untuk: " + ", ".join(missing))
+
+                        st.subheader("Harga Penutupan")
+                        st.dataframe(wide_close, use_container_width=True, height=400)
+                        st.subheader("Log Return")
+                        st.dataframe(wide_returns, use_container_width=True, height=400)
+
+                        download_buttons({'Close': wide_close.reset_index(),
+                                          'Log Return': wide_returns.reset_index()},
+                                         "preset_data", key="preset_download")
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
+
+    elif st.button("📥 Lihat dan Download Data Saham", type="primary", use_container_width=True):
         try:
             # Validasi ticker tidak kosong
             if not ticker_symbol or ticker_symbol.strip() == "" or ticker_symbol.strip() == ".JK":
                 st.error("❌ Ticker saham tidak boleh kosong!")
             else:
                 with st.spinner(f'Mengunduh data {ticker_symbol}...'):
-                    data = yf.download(ticker_symbol, start=start_date, end=end_date, progress=False)
+                    if data_interval == '1d':
+                        with perf.stage('download', ticker=ticker_symbol):
+                            data = get_price_store().get(ticker_symbol, start_date, end_date)
+                    else:
+                        # Bar intraday disimpan per bulan, lalu di-resample dan dihitung log return-nya per potongan
+                        data = load_bars(get_intraday_store(), ticker_symbol, start_date, end_date, data_interval,
+                                         resample_rule, perf=perf)
                     
                     if data.empty:
                         st.error(f"❌ Data tidak ditemukan untuk ticker **{ticker_symbol}**")
@@ -156,11 +443,13 @@ with tab1:
                         data = data.reset_index()
                         close_price = data[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']].copy()
                         close_price.columns = ['Date', 'Open', 'High', 'Low', 'price.close', 'Volume']
-                        close_price['Log Return'] = close_price['price.close'].pct_change().apply(
-                            lambda x: np.log(1 + x) if pd.notna(x) and x != -1 else np.nan
-                        )
+                        if data_interval == '1d':
+                            with perf.stage('returns'):
+                                close_price['Log Return'] = compute_returns(close_price['price.close'])
+                        else:
+                            close_price['Log Return'] = data['Log Return']
                         
-                        st.session_state['downloaded_data'] = close_price
+                        st.session_state['downloaded_data'] = compact_frame(close_price) if compact_mode else close_price
                         st.session_state['stock_ticker'] = ticker_symbol
                         
                         st.markdown(f"""
@@ -191,19 +480,9 @@ with tab1:
                         with col4:
                             st.metric("Count", f"{len(log_returns)}")
                         
-                        output = io.BytesIO()
-                        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                            close_price.to_excel(writer, index=False, sheet_name='Data')
-                        
                         # Buat nama file yang aman
                         safe_filename = ticker_symbol.replace(".", "_")
-                        st.download_button(
-                            label="💾 Download ke Excel",
-                            data=output.getvalue(),
-                            file_name=f"{safe_filename}_data.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True
-                        )
+                        download_buttons({'Data': close_price}, f"{safe_filename}_data", key="ticker_download")
         except Exception as e:
             st.error(f"❌ Error: {str(e)}")
             st.info("💡 Pastikan ticker yang Anda masukkan benar dan tersedia di Yahoo Finance")
@@ -218,6 +497,7 @@ with tab2:
             <li>Data > 50: Menggunakan uji <strong>Kolmogorov-Smirnov</strong></li>
             <li>Data ≤ 50: Menggunakan uji <strong>Shapiro-Wilk</strong></li>
             <li>Data dianggap normal jika p-value > α (taraf signifikansi)</li>
+            <li>Format file: <strong>Excel (.xlsx/.xls)</strong>, <strong>CSV</strong>, atau <strong>Parquet</strong></li>
             <li>File harus memiliki kolom harga <strong>'Close'</strong>, <strong>'close'</strong>, <strong>'Close Price'</strong>, atau <strong>'price.close'</strong></li>
         </ul>
     </div>
@@ -231,21 +511,14 @@ with tab2:
         index=1  # Default 5%
     )
     
-    uploaded_file = st.file_uploader("Upload File Excel Data Saham", type=['xlsx', 'xls'])
+    uploaded_file = st.file_uploader("Upload File Data Saham (Excel/CSV/Parquet)", type=UPLOAD_TYPES)
+    use_float32 = st.checkbox("Simpan harga sebagai float32 (hemat memori untuk data panjang)", value=False)
     
     if uploaded_file is not None:
         try:
-            df = pd.read_excel(uploaded_file)
-            
-            # Cari kolom close price dengan berbagai kemungkinan nama
-            close_col = None
-            possible_names = ['Close', 'close', 'Close Price', 'close price', 'price.close', 
-                             'CLOSE', 'Closing Price', 'closing price']
-            
-            for col_name in possible_names:
-                if col_name in df.columns:
-                    close_col = col_name
-                    break
+            # Parsing dan log return di-cache per isi file, tidak diulang setiap rerun
+            with perf.stage('read_file', filename=uploaded_file.name, size=uploaded_file.size):
+                df, close_col = load_uploaded_prices(uploaded_file.getvalue(), uploaded_file.name, use_float32)
             
             if close_col is None:
                 st.error("❌ File harus memiliki kolom harga penutupan (Close/close/Close Price/price.close)")
@@ -253,11 +526,6 @@ with tab2:
             else:
                 st.success(f"✅ Kolom harga ditemukan: '{close_col}'")
                 
-                # Hitung Log Return: Ln(Pt / Pt-1)
-                df['Log Return'] = df[close_col].pct_change().apply(
-                    lambda x: np.log(1 + x) if pd.notna(x) and x != -1 else np.nan
-                )
-                
                 log_returns = df['Log Return'].dropna()
                 n = len(log_returns)
                 
@@ -270,13 +538,10 @@ with tab2:
                 
                 st.subheader("🔬 Hasil Uji Normalitas")
                 
-                if n > 50:
-                    stat, p_value = stats.kstest(log_returns, 'norm', args=(log_returns.mean(), log_returns.std()))
-                    test_name = "Kolmogorov-Smirnov"
-                else:
-                    stat, p_value = stats.shapiro(log_returns)
-                    test_name = "Shapiro-Wilk"
+                with perf.stage('normality_test', n=n):
+                    test_name, stat, p_value = cached_normality_test(log_returns)
                 
+                # Hanya perbandingan dengan alpha yang dihitung ulang saat alpha berubah
                 is_normal = p_value > alpha_test
                 
                 col1, col2, col3, col4 = st.columns(4)
@@ -314,34 +579,99 @@ with tab2:
                     </div>
                     """, unsafe_allow_html=True)
                 
-                st.session_state['uploaded_data'] = df
-                st.session_state['log_returns'] = log_returns
+                if compact_mode:
+                    # Hanya array log return, tanggal, dan momennya yang disimpan; tabel upload tidak
+                    date_col = find_column(list(df.columns), DATE_COLUMN_NAMES)
+                    with perf.stage('compact_returns'):
+                        compact_returns = CompactReturns.from_series(
+                            log_returns, dates=df.loc[log_returns.index, date_col] if date_col is not None else None
+                        )
+                    st.session_state.pop('uploaded_data', None)
+                    st.session_state['log_returns'] = compact_returns
+                else:
+                    st.session_state['uploaded_data'] = df
+                    st.session_state['log_returns'] = log_returns
                 st.session_state['is_normal'] = is_normal
                 st.session_state['p_value'] = p_value
                 st.session_state['test_name'] = test_name
                 
                 st.subheader("📊 Statistik Deskriptif")
-                mean_ret = log_returns.mean()
-                std_ret = log_returns.std()
-                skew_ret = stats.skew(log_returns)
-                kurt_ret = stats.kurtosis(log_returns)
+                with perf.stage('describe_returns'):
+                    return_stats = compact_returns.stats if compact_mode else cached_describe_returns(log_returns)
+                st.session_state['return_stats'] = return_stats
                 
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("Mean", f"{mean_ret:.7f}")
-                    st.metric("Median", f"{log_returns.median():.7f}")
+                    st.metric("Mean", f"{return_stats['mean']:.7f}")
+                    st.metric("Median", f"{return_stats['median']:.7f}")
                 with col2:
-                    st.metric("Std Dev", f"{std_ret:.7f}")
-                    st.metric("Variance", f"{log_returns.var():.7f}")
+                    st.metric("Std Dev", f"{return_stats['std']:.7f}")
+                    st.metric("Variance", f"{return_stats['var']:.7f}")
                 with col3:
-                    st.metric("Skewness", f"{skew_ret:.7f}")
-                    st.metric("Kurtosis", f"{kurt_ret:.7f}")
+                    st.metric("Skewness", f"{return_stats['skew']:.7f}")
+                    st.metric("Kurtosis", f"{return_stats['kurtosis']:.7f}")
                 with col4:
-                    st.metric("Min", f"{log_returns.min():.7f}")
-                    st.metric("Max", f"{log_returns.max():.7f}")
+                    st.metric("Min", f"{return_stats['min']:.7f}")
+                    st.metric("Max", f"{return_stats['max']:.7f}")
+
+                show_session_memory()
         except Exception as e:
             st.error(f"❌ Error membaca file: {str(e)}")
 
+    st.markdown("---")
+    st.subheader("🔎 Screening Normalitas Multi-Saham")
+    st.markdown("""
+    <div class="info-box">
+        Uji normalitas dan statistik deskriptif untuk banyak saham sekaligus: momen dihitung per kolom dalam satu
+        langkah vektor dan uji normalitas dijalankan paralel. Setiap saham diarahkan ke <strong>Monte Carlo (Normal)</strong>
+        atau <strong>Cornish-Fisher</strong> dengan aturan p-value yang sama seperti uji satu file di atas.
+    </div>
+    """, unsafe_allow_html=True)
+
+    screen_sources = ["📁 Upload Beberapa File"]
+    if 'batch_log_returns' in st.session_state:
+        screen_sources.insert(0, "📚 Data Daftar Preset (Tab 1)")
+    screen_source = st.radio("Sumber Data Screening", screen_sources, horizontal=True)
+
+    screen_returns = None
+    if screen_source == "📁 Upload Beberapa File":
+        screen_files = st.file_uploader("Upload File Data Saham (boleh lebih dari satu)", type=UPLOAD_TYPES,
+                                        accept_multiple_files=True, key="screen_files")
+        if screen_files:
+            screen_columns, unreadable = {}, []
+            with perf.stage('read_file', files=len(screen_files)):
+                for screen_file in screen_files:
+                    try:
+                        df, close_col = load_uploaded_prices(screen_file.getvalue(), screen_file.name, use_float32)
+                    except Exception:
+                        close_col = None
+                    if close_col is None:
+                        unreadable.append(screen_file.name)
+                    else:
+                        # Kolom disejajarkan per posisi; uji dan momen dihitung per kolom tanpa NaN
+                        screen_columns[os.path.splitext(screen_file.name)[0]] = \
+                            df['Log Return'].reset_index(drop=True)
+            if unreadable:
+                st.warning("⚠️ Kolom harga penutupan tidak ditemukan pada: " + ", ".join(unreadable))
+            if screen_columns:
+                screen_returns = pd.DataFrame(screen_columns)
+    else:
+        screen_returns = st.session_state['batch_log_returns']
+
+    if screen_returns is not None:
+        with perf.stage('normality_screen', tickers=screen_returns.shape[1]):
+            df_screen = route_screen(cached_normality_tests(screen_returns), alpha_test)
+        tested = df_screen['P-Value'].notna()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Jumlah Saham", len(df_screen))
+        col2.metric("Monte Carlo (Normal)", int((df_screen['Metode VaR'] == 'Monte Carlo (Normal)').sum()))
+        col3.metric("Cornish-Fisher", int((df_screen['Metode VaR'] == 'Cornish-Fisher').sum()))
+        if not tested.all():
+            st.warning("⚠️ Data terlalu sedikit untuk diuji: " + ", ".join(map(str, df_screen.index[~tested])))
+        st.dataframe(df_screen, use_container_width=True)
+        download_buttons({'Screening Normalitas': df_screen.rename_axis('Ticker').reset_index()},
+                         "normality_screening", key="screen_download")
+
 with tab3:
     st.header("📊 Perhitungan Value at Risk (VaR)")
     
@@ -349,7 +679,10 @@ with tab3:
         st.warning("⚠️ Silakan upload data dan lakukan uji normalitas terlebih dahulu di Tab 2")
     else:
         log_returns = st.session_state['log_returns']
+        if isinstance(log_returns, CompactReturns):
+            log_returns = log_returns.series()
         is_normal = st.session_state['is_normal']
+        data_key = job_key(log_returns)
         
         st.subheader("⚙️ Parameter Simulasi")
         
@@ -361,6 +694,15 @@ with tab3:
             </div>
             """, unsafe_allow_html=True)
             
+            simulation_method = st.selectbox(
+                "Metode Simulasi",
+                options=list(SIMULATION_METHODS),
+                help="Satu draw per jalur, QMC, dan parametrik memberikan VaR yang sama secara teori "
+                     "untuk distribusi Normal, dengan biaya komputasi jauh lebih kecil"
+            )
+            sampler = SIMULATION_METHODS[simulation_method]
+            model_name = None
+            
             col1, col2 = st.columns(2)
             with col1:
                 v0 = st.number_input("Nilai Investasi Awal (V0) dalam Rupiah", 
@@ -368,23 +710,78 @@ with tab3:
                                      value=100000000, step=1000000, format="%d")
                 st.write(f"**Nilai Investasi:** Rp {v0:,.0f}")
             
-            with col2:
-                iterations = st.number_input("Jumlah Iterasi Monte Carlo", 
-                                             min_value=5, max_value=1000000, 
-                                             value=1000, step=100)
+            adaptive = False
+            if sampler == 'parametric':
+                iterations = None  # Closed-form tidak memerlukan simulasi
+                seed = None
+                workers = 1
+            else:
+                with col2:
+                    if sampler in ('paths', 'collapsed'):
+                        adaptive = st.checkbox("Iterasi adaptif (berhenti saat presisi tercapai)", value=False)
+                    if adaptive:
+                        target_precision = st.number_input("Target Presisi Relatif (%)", min_value=0.1,
+                                                           max_value=50.0, value=1.0, step=0.1,
+                                                           help="Setengah lebar interval kepercayaan 95% "
+                                                                "dibanding nilai VaR")
+                        iterations = st.number_input("Batas Maksimum Iterasi", 
+                                                     min_value=1000, max_value=100000000, 
+                                                     value=10000000, step=100000,
+                                                     help="Dibatasi otomatis agar buffer ekor muat dalam "
+                                                          f"{TAIL_BYTES // 2**20} MB")
+                    else:
+                        iterations = st.number_input("Jumlah Iterasi Monte Carlo", 
+                                                     min_value=5, max_value=100000000, 
+                                                     value=1000, step=100, help=TAIL_MEMORY_HELP)
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    seed = st.number_input("Seed Acak (opsional)", min_value=0, value=None, step=1,
+                                           help="Isi seed agar hasil simulasi dapat direproduksi")
+                with col2:
+                    workers = st.number_input("Jumlah Worker Paralel", min_value=1,
+                                              max_value=os.cpu_count() or 1, value=1, step=1)
         else:
             st.markdown("""
             <div class="warning-box">
-                <strong>📊 Metode:</strong> VaR dengan <strong>Cornish-Fisher Expansion</strong><br>
-                Data tidak berdistribusi normal, menggunakan adjusted quantile berdasarkan skewness dan kurtosis.
+                <strong>📊 Metode:</strong> VaR dengan <strong>Cornish-Fisher Expansion</strong> atau simulasi berekor tebal<br>
+                Data tidak berdistribusi normal, menggunakan adjusted quantile berdasarkan skewness dan kurtosis,
+                atau simulasi Student-t, bootstrap historis, maupun GARCH(1,1).
             </div>
             """, unsafe_allow_html=True)
             
-            v0 = st.number_input("Nilai Investasi Awal (V0) dalam Rupiah", 
-                                 min_value=100000, max_value=9007199254740991, 
-                                 value=100000000, step=1000000, format="%d")
-            st.write(f"**Nilai Investasi:** Rp {v0:,.0f}")
-            iterations = None  # Tidak perlu iterasi untuk Cornish-Fisher
+            simulation_method = st.selectbox(
+                "Metode Perhitungan",
+                options=list(NON_NORMAL_METHODS),
+                help="Student-t menangkap ekor tebal, bootstrap memakai distribusi empiris, dan GARCH(1,1) "
+                     "menangkap volatility clustering"
+            )
+            model_name = NON_NORMAL_METHODS[simulation_method]
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                v0 = st.number_input("Nilai Investasi Awal (V0) dalam Rupiah", 
+                                     min_value=100000, max_value=9007199254740991, 
+                                     value=100000000, step=1000000, format="%d")
+                st.write(f"**Nilai Investasi:** Rp {v0:,.0f}")
+            sampler = None
+            adaptive = False
+            if model_name is None:
+                iterations = None  # Tidak perlu iterasi untuk Cornish-Fisher
+                seed = None
+                workers = 1
+            else:
+                with col2:
+                    iterations = st.number_input("Jumlah Iterasi Simulasi", 
+                                                 min_value=5, max_value=100000000, 
+                                                 value=100000, step=10000, help=TAIL_MEMORY_HELP)
+                col1, col2 = st.columns(2)
+                with col1:
+                    seed = st.number_input("Seed Acak (opsional)", min_value=0, value=None, step=1,
+                                           help="Isi seed agar hasil simulasi dapat direproduksi")
+                with col2:
+                    workers = st.number_input("Jumlah Worker Paralel", min_value=1,
+                                              max_value=os.cpu_count() or 1, value=1, step=1)
         
         st.markdown("---")
         st.subheader("📋 Parameter Holding Period & Confidence Level")
@@ -418,210 +815,466 @@ with tab3:
 
         # TOMBOL HITUNG VaR
         if st.button("🚀 Hitung Value at Risk", type="primary", use_container_width=True):
+            # Parameter
+            if use_preset:
+                alphas = [0.01, 0.05, 0.10]
+                holding_periods = [1, 5, 20]
+            else:
+                alphas = [(100 - cl) / 100 for cl in custom_conf_levels]
+                # holding_periods sudah didefinisikan di atas
 
-            with st.spinner('Menghitung VaR...'):
+            # Simulasi tanpa seed diberi seed konkret sebelum kunci job dibuat: kunci dengan
+            # seed=None akan memutar ulang hasil yang sama dari cache selamanya
+            seed_drawn = iterations is not None and seed is None
+            if seed_drawn:
+                seed = int(np.random.default_rng().integers(2**53))
 
-                # Parameter
-                if use_preset:
-                    alphas = [0.01, 0.05, 0.10]
-                    holding_periods = [1, 5, 20]
-                else:
-                    alphas = [(100 - cl) / 100 for cl in custom_conf_levels]
-                    # holding_periods sudah didefinisikan di atas
-                
-                mean_return = log_returns.mean()
-                std_return = log_returns.std()
-                skewness = stats.skew(log_returns)
-                kurtosis = stats.kurtosis(log_returns)
+            var_request = {
+                'is_normal': bool(is_normal),
+                'simulation_method': simulation_method,
+                'sampler': sampler,
+                'model_name': model_name,
+                'adaptive': adaptive,
+                'target_precision': target_precision if adaptive else None,
+                'iterations': iterations,
+                'seed': seed,
+                'alphas': alphas,
+                'holding_periods': holding_periods,
+                'return_stats': {key: float(st.session_state['return_stats'][key])
+                                 for key in ('mean', 'std', 'skew', 'kurtosis')},
+            }
+            # Job yang sama (data + parameter) dipakai ulang lintas sesi; V0 dan jumlah worker
+            # tidak mengubah hasil sehingga tidak ikut dalam kunci
+            var_request['job_key'] = job_key(data_key, var_request)
+            var_request.update(data_key=data_key, v0=v0, seed_drawn=seed_drawn)
+            st.session_state['var_request'] = var_request
+            deferred_perf['var_job'] = PerfRecorder(perf.enabled, context=perf.context)
+            get_job_manager().submit(var_request['job_key'], compute_var, var_request, log_returns, workers=workers,
+                                     perf=deferred_perf['var_job'])
 
-                # Hasil simulasi
-                results = []
+        var_request = st.session_state.get('var_request')
+        var_job = None
+        if var_request is not None and var_request['data_key'] == data_key and var_request['is_normal'] == is_normal:
+            var_job = get_job_manager().get(var_request['job_key'])
+            if var_job is not None and not var_job.finished:
+                # Job singkat (parametrik/Cornish-Fisher) langsung ditampilkan tanpa panel progres
+                var_job.wait(0.5)
 
-                if is_normal:
-                    # METODE MONTE CARLO (NORMAL)
-                    for alpha in alphas:
-                        for hp in holding_periods:
-                            simulations = []
-
-                            for _ in range(iterations):
-                                cum_return = 0
-                                for _ in range(hp):
-                                    daily_return = np.random.normal(mean_return, std_return)
-                                    cum_return += daily_return
-                                simulations.append(cum_return)
-
-                            simulations.sort()
-                            var_index = int(alpha * iterations)
-                            var_value = simulations[var_index]
-                            var_amount = abs(var_value * v0)
-
-                            results.append({
-                                'Metode': 'Monte Carlo (Normal)',
-                                'Confidence Level': f"{int((1-alpha)*100)}%",
-                                'Alpha': f"{int(alpha*100)}%",
-                                'Holding Period': f"{hp} hari",
-                                'VaR Value': var_value,
-                                'Kerugian Maksimal (Rp)': var_amount
-                            })
-                else:
-                    # METODE CORNISH-FISHER EXPANSION
-                    for alpha in alphas:
-                        for hp in holding_periods:
-                            # Z-score normal
-                            z_alpha = stats.norm.ppf(alpha)
-                            
-                            # Cornish-Fisher adjusted quantile
-                            z_cf = (z_alpha + 
-                                   (z_alpha**2 - 1) * skewness / 6 + 
-                                   (z_alpha**3 - 3*z_alpha) * kurtosis / 24 - 
-                                   (2*z_alpha**3 - 5*z_alpha) * skewness**2 / 36)
-                            
-                            # VaR calculation
-                            var_value = mean_return * hp + z_cf * std_return * np.sqrt(hp)
-                            var_amount = abs(var_value * v0)
-
-                            results.append({
-                                'Metode': 'Cornish-Fisher',
-                                'Confidence Level': f"{int((1-alpha)*100)}%",
-                                'Alpha': f"{int(alpha*100)}%",
-                                'Holding Period': f"{hp} hari",
-                                'Z-score (Normal)': z_alpha,
-                                'Z-score (CF Adjusted)': z_cf,
-                                'VaR Value': var_value,
-                                'Kerugian Maksimal (Rp)': var_amount
-                            })
-
-                # Convert to DataFrame
-                df_results = pd.DataFrame(results)
-
-                # INTERPRETASI – VARIABEL
-                try:
-                    example_99_1 = df_results[(df_results['Alpha'] == '1%') & 
-                                              (df_results['Holding Period'] == '1 hari')].iloc[0] if not df_results[(df_results['Alpha'] == '1%') & (df_results['Holding Period'] == '1 hari')].empty else None
-                except:
-                    example_99_1 = None
+        if var_job is not None and not var_job.finished:
+            show_var_progress(var_job, var_request)
+        elif var_job is not None and var_job.status == CANCELLED:
+            st.warning("⏹️ Perhitungan VaR dibatalkan")
+        elif var_job is not None and var_job.status == FAILED:
+            st.error(f"❌ Error: {var_job.error}")
+        elif var_job is not None:
+            # Parameter dan hasil diambil dari permintaan yang dijalankan, bukan dari widget saat ini
+            alphas = var_request['alphas']
+            holding_periods = var_request['holding_periods']
+            simulation_method = var_request['simulation_method']
+            sampler = var_request['sampler']
+            model_name = var_request['model_name']
+            adaptive = var_request['adaptive']
+            target_precision = var_request['target_precision']
+            iterations = var_request['iterations']
+            v0 = var_request['v0']
+            mean_return = var_request['return_stats']['mean']
+            std_return = var_request['return_stats']['std']
+            skewness = var_request['return_stats']['skew']
+            kurtosis = var_request['return_stats']['kurtosis']
 
-                try:
-                    example_95_1 = df_results[(df_results['Alpha'] == '5%') & 
-                                              (df_results['Holding Period'] == '1 hari')].iloc[0] if not df_results[(df_results['Alpha'] == '5%') & (df_results['Holding Period'] == '1 hari')].empty else None
-                except:
-                    example_95_1 = None
+            risk = var_job.result
+            var_grid, es_grid, stderr_grid = risk['var'], risk['es'], risk['stderr']
+            ladder_grid = risk['ladder']
+            tail_histograms = risk['histogram']
+            adaptive_result = risk['adaptive']
+            cf_valid = risk['cf_valid']
 
-                try:
-                    example_90_1 = df_results[(df_results['Alpha'] == '10%') & 
-                                              (df_results['Holding Period'] == '1 hari')].iloc[0] if not df_results[(df_results['Alpha'] == '10%') & (df_results['Holding Period'] == '1 hari')].empty else None
-                except:
-                    example_90_1 = None
+            # Hasil perhitungan
+            results = []
+            for i, alpha in enumerate(alphas):
+                for j, hp in enumerate(holding_periods):
+                    var_value = var_grid[i, j]
+                    var_amount = abs(var_value * v0)
 
-                st.success("✅ Perhitungan VaR selesai!")
+                    row = {
+                        'Metode': 'Cornish-Fisher' if cf_valid is not None else simulation_method,
+                        'Confidence Level': f"{int((1-alpha)*100)}%",
+                        'Alpha': f"{int(alpha*100)}%",
+                        'Holding Period': f"{hp} hari"
+                    }
+                    if cf_valid is not None:
+                        row['Z-score (Normal)'] = risk['z_alpha'][i, 0]
+                        row['Z-score (CF Adjusted)'] = risk['z_cf'][i, 0]
+                    row['VaR Value'] = var_value
+                    if stderr_grid is not None:
+                        row['Std Error'] = stderr_grid[i, j]
+                    row.update({
+                        'Kerugian Maksimal (Rp)': var_amount,
+                        'Expected Shortfall': es_grid[i, j],
+                        'ES (Rp)': abs(es_grid[i, j] * v0)
+                    })
+                    if adaptive_result is not None:
+                        row.update({
+                            'Iterasi Terpakai': int(adaptive_result['iterations'][i, j]),
+                            'CI 95% Bawah': adaptive_result['lower'][i, j],
+                            'CI 95% Atas': adaptive_result['upper'][i, j],
+                            'Konvergen': bool(adaptive_result['converged'][i, j])
+                        })
+                    results.append(row)
 
-                # TAMPILKAN HASIL VaR
-                st.subheader("📈 Statistik Data")
-                col1, col2, col3, col4 = st.columns(4)
-                col1.metric("Mean Log Return", f"{mean_return:.7f}")
-                col2.metric("Std Deviation", f"{std_return:.7f}")
-                col3.metric("Skewness", f"{skewness:.7f}")
-                col4.metric("Kurtosis", f"{kurtosis:.7f}")
-                
-                if is_normal:
-                    st.info(f"🔄 **Jumlah Iterasi Monte Carlo:** {iterations:,}")
+            # Convert to DataFrame
+            df_results = pd.DataFrame(results)
+            df_ladder = pd.DataFrame(ladder_grid, columns=[f"{hp} hari" for hp in holding_periods])
+            df_ladder.insert(0, 'Confidence Level', [f"{(1-level)*100:g}%" for level in TAIL_LADDER])
 
-                st.subheader("📊 Hasil Perhitungan VaR")
+            # INTERPRETASI – VARIABEL
+            try:
+                example_99_1 = df_results[(df_results['Alpha'] == '1%') & 
+                                          (df_results['Holding Period'] == '1 hari')].iloc[0] if not df_results[(df_results['Alpha'] == '1%') & (df_results['Holding Period'] == '1 hari')].empty else None
+            except:
+                example_99_1 = None
 
-                df_display = df_results.copy()
-                df_display['VaR Value'] = df_display['VaR Value'].apply(lambda x: f"{x:.6f}")
-                df_display['Kerugian Maksimal (Rp)'] = df_display['Kerugian Maksimal (Rp)'].apply(
-                    lambda x: f"Rp {x:,.0f}"
-                )
+            try:
+                example_95_1 = df_results[(df_results['Alpha'] == '5%') & 
+                                          (df_results['Holding Period'] == '1 hari')].iloc[0] if not df_results[(df_results['Alpha'] == '5%') & (df_results['Holding Period'] == '1 hari')].empty else None
+            except:
+                example_95_1 = None
 
-                st.dataframe(df_display, use_container_width=True)
+            try:
+                example_90_1 = df_results[(df_results['Alpha'] == '10%') & 
+                                          (df_results['Holding Period'] == '1 hari')].iloc[0] if not df_results[(df_results['Alpha'] == '10%') & (df_results['Holding Period'] == '1 hari')].empty else None
+            except:
+                example_90_1 = None
 
-                # INTERPRETASI HASIL
-                st.subheader("📝 Interpretasi Hasil")
-                
-                interpretation_text = "<div class='info-box'><h4>💡 Interpretasi VaR:</h4>"
-                
-                if example_99_1 is not None:
-                    loss_99 = example_99_1['Kerugian Maksimal (Rp)']
-                    interpretation_text += f"<p><strong>VaR 99% (1 hari):</strong> Dengan tingkat kepercayaan 99%, kerugian maksimal dalam 1 hari tidak akan melebihi <strong>Rp {loss_99:,.0f}</strong>.</p>"
-                
-                if example_95_1 is not None:
-                    loss_95 = example_95_1['Kerugian Maksimal (Rp)']
-                    interpretation_text += f"<p><strong>VaR 95% (1 hari):</strong> Dengan tingkat kepercayaan 95%, kerugian maksimal dalam 1 hari tidak akan melebihi <strong>Rp {loss_95:,.0f}</strong>.</p>"
-                
-                if example_90_1 is not None:
-                    loss_90 = example_90_1['Kerugian Maksimal (Rp)']
-                    interpretation_text += f"<p><strong>VaR 90% (1 hari):</strong> Dengan tingkat kepercayaan 90%, kerugian maksimal dalam 1 hari tidak akan melebihi <strong>Rp {loss_90:,.0f}</strong>.</p>"
-                
-                interpretation_text += """
-    <hr style="margin-top:10px;margin-bottom:10px;">
-    <p><strong>Catatan:</strong></p>
-    <ul>
-        <li>VaR mengukur kerugian maksimal pada tingkat kepercayaan tertentu dalam kondisi pasar normal.</li>
-        <li>Semakin tinggi confidence level (semakin rendah alpha), semakin besar nilai VaR.</li>
-        <li>Semakin panjang holding period, semakin besar risiko kerugian potensial.</li>
+            st.success("✅ Perhitungan VaR selesai!")
+            if var_job.cached:
+                st.caption("♻️ Hasil diambil dari cache perhitungan sebelumnya (data dan parameter identik)")
+            if var_request['seed_drawn']:
+                st.caption(f"🎲 Seed acak yang dipakai: {var_request['seed']} "
+                           "(isi di kolom Seed Acak untuk mereproduksi hasil ini)")
+
+            # TAMPILKAN HASIL VaR
+            st.subheader("📈 Statistik Data")
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Mean Log Return", f"{mean_return:.7f}")
+            col2.metric("Std Deviation", f"{std_return:.7f}")
+            col3.metric("Skewness", f"{skewness:.7f}")
+            col4.metric("Kurtosis", f"{kurtosis:.7f}")
+            
+            if is_normal and adaptive:
+                st.info(f"🔄 **Iterasi Adaptif:** target presisi {target_precision}%, "
+                        f"maksimum {iterations:,} iterasi per sel")
+            elif iterations:
+                st.info(f"🔄 **Jumlah Iterasi Simulasi:** {iterations:,}")
+
+            st.subheader("📊 Hasil Perhitungan VaR")
+
+            df_display = df_results.copy()
+            df_display['VaR Value'] = df_display['VaR Value'].apply(lambda x: f"{x:.6f}")
+            if 'Std Error' in df_display:
+                df_display['Std Error'] = df_display['Std Error'].apply(lambda x: f"{x:.6f}")
+            df_display['Kerugian Maksimal (Rp)'] = df_display['Kerugian Maksimal (Rp)'].apply(
+                lambda x: f"Rp {x:,.0f}"
+            )
+            df_display['Expected Shortfall'] = df_display['Expected Shortfall'].apply(lambda x: f"{x:.6f}")
+            df_display['ES (Rp)'] = df_display['ES (Rp)'].apply(lambda x: f"Rp {x:,.0f}")
+
+            st.dataframe(df_display, use_container_width=True)
+
+            if cf_valid is not None and not cf_valid.all():
+                invalid_levels = ", ".join(f"{int((1-alpha)*100)}%" for alpha, ok in zip(alphas, cf_valid) if not ok)
+                st.warning(f"⚠️ Ekspansi Cornish-Fisher tidak monoton pada confidence level {invalid_levels} "
+                           "(skewness/kurtosis terlalu ekstrem); hasil VaR pada level ini kurang dapat diandalkan.")
+
+            st.subheader("📉 Tangga Quantile Ekor")
+            st.dataframe(df_ladder, use_container_width=True, hide_index=True)
+
+            if tail_histograms is not None:
+                st.subheader("📊 Histogram Ekor Simulasi")
+                hist_tabs = st.tabs([f"{hp} hari" for hp in holding_periods])
+                for hist_tab, (counts, edges) in zip(hist_tabs, tail_histograms):
+                    with hist_tab:
+                        st.bar_chart(pd.DataFrame({'Frekuensi': counts}, index=[f"{x:.4f}" for x in edges[:-1]]))
+
+            # INTERPRETASI HASIL
+            st.subheader("📝 Interpretasi Hasil")
+            
+            interpretation_text = "<div class='info-box'><h4>💡 Interpretasi VaR:</h4>"
+            
+            if example_99_1 is not None:
+                loss_99 = example_99_1['Kerugian Maksimal (Rp)']
+                interpretation_text += f"<p><strong>VaR 99% (1 hari):</strong> Dengan tingkat kepercayaan 99%, kerugian maksimal dalam 1 hari tidak akan melebihi <strong>Rp {loss_99:,.0f}</strong>.</p>"
+            
+            if example_95_1 is not None:
+                loss_95 = example_95_1['Kerugian Maksimal (Rp)']
+                interpretation_text += f"<p><strong>VaR 95% (1 hari):</strong> Dengan tingkat kepercayaan 95%, kerugian maksimal dalam 1 hari tidak akan melebihi <strong>Rp {loss_95:,.0f}</strong>.</p>"
+            
+            if example_90_1 is not None:
+                loss_90 = example_90_1['Kerugian Maksimal (Rp)']
+                interpretation_text += f"<p><strong>VaR 90% (1 hari):</strong> Dengan tingkat kepercayaan 90%, kerugian maksimal dalam 1 hari tidak akan melebihi <strong>Rp {loss_90:,.0f}</strong>.</p>"
+            
+            interpretation_text += """
+<hr style="margin-top:10px;margin-bottom:10px;">
+<p><strong>Catatan:</strong></p>
+<ul>
+    <li>VaR mengukur kerugian maksimal pada tingkat kepercayaan tertentu dalam kondisi pasar normal.</li>
+    <li>Semakin tinggi confidence level (semakin rendah alpha), semakin besar nilai VaR.</li>
+    <li>Semakin panjang holding period, semakin besar risiko kerugian potensial.</li>
 """
-                
-                if is_normal:
-                    interpretation_text += "        <li>Monte Carlo mengasumsikan distribusi normal dari return dan menggunakan simulasi acak untuk mengestimasi VaR.</li>\n    </ul>\n</div>"
-                else:
-                    interpretation_text += "        <li>Cornish-Fisher menyesuaikan estimasi VaR berdasarkan skewness dan kurtosis distribusi, memberikan hasil yang lebih akurat untuk data non-normal.</li>\n    </ul>\n</div>"
-                
-                st.markdown(interpretation_text, unsafe_allow_html=True)
-                
-                # KESIMPULAN DAN MASUKAN
-                st.subheader("📌 Kesimpulan dan Rekomendasi")
-                
-                # Analisis risiko berdasarkan hasil
-                max_loss = df_results['Kerugian Maksimal (Rp)'].max()
-                max_loss_pct = (max_loss / v0) * 100
-                
-                if max_loss_pct < 5:
-                    risk_level = "RENDAH"
-                    risk_color = "success-box"
-                    recommendation = "Portofolio menunjukkan risiko yang rendah. Investasi ini relatif aman dengan potensi kerugian maksimal di bawah 5% dari nilai investasi."
-                elif max_loss_pct < 15:
-                    risk_level = "SEDANG"
-                    risk_color = "warning-box"
-                    recommendation = "Portofolio menunjukkan risiko sedang. Pertimbangkan untuk melakukan diversifikasi atau hedging untuk mengurangi eksposur risiko."
-                else:
-                    risk_level = "TINGGI"
-                    risk_color = "error-box"
-                    recommendation = "Portofolio menunjukkan risiko tinggi dengan potensi kerugian melebihi 15%. Sangat disarankan untuk melakukan review strategi investasi dan diversifikasi portofolio."
-                
-                st.markdown(f"""
+            
+            if is_normal:
+                interpretation_text += "        <li>Monte Carlo mengasumsikan distribusi normal dari return dan menggunakan simulasi acak untuk mengestimasi VaR.</li>\n    </ul>\n</div>"
+            elif model_name is not None:
+                interpretation_text += f"        <li>{simulation_method} mensimulasikan jalur return dari model yang diestimasi pada data historis, sehingga ekor tebal{' dan volatility clustering' if model_name in ('garch', 'filtered_garch') else ''} ikut diperhitungkan.</li>\n    </ul>\n</div>"
+            else:
+                interpretation_text += "        <li>Cornish-Fisher menyesuaikan estimasi VaR berdasarkan skewness dan kurtosis distribusi, memberikan hasil yang lebih akurat untuk data non-normal.</li>\n    </ul>\n</div>"
+            
+            st.markdown(interpretation_text, unsafe_allow_html=True)
+            
+            # KESIMPULAN DAN MASUKAN
+            st.subheader("📌 Kesimpulan dan Rekomendasi")
+            
+            # Analisis risiko berdasarkan hasil
+            max_loss = df_results['Kerugian Maksimal (Rp)'].max()
+            max_loss_pct = (max_loss / v0) * 100
+            
+            if max_loss_pct < 5:
+                risk_level = "RENDAH"
+                risk_color = "success-box"
+                recommendation = "Portofolio menunjukkan risiko yang rendah. Investasi ini relatif aman dengan potensi kerugian maksimal di bawah 5% dari nilai investasi."
+            elif max_loss_pct < 15:
+                risk_level = "SEDANG"
+                risk_color = "warning-box"
+                recommendation = "Portofolio menunjukkan risiko sedang. Pertimbangkan untuk melakukan diversifikasi atau hedging untuk mengurangi eksposur risiko."
+            else:
+                risk_level = "TINGGI"
+                risk_color = "error-box"
+                recommendation = "Portofolio menunjukkan risiko tinggi dengan potensi kerugian melebihi 15%. Sangat disarankan untuk melakukan review strategi investasi dan diversifikasi portofolio."
+            
+            st.markdown(f"""
 <div class="{risk_color}">
-    <h4>🎯 Tingkat Risiko: {risk_level}</h4>
-    <p><strong>Potensi Kerugian Maksimal:</strong> Rp {max_loss:,.0f} ({max_loss_pct:.2f}% dari investasi)</p>
-    <p><strong>Rekomendasi:</strong> {recommendation}</p>
-    <hr style="margin-top:10px;margin-bottom:10px;">
-    <p><strong>Saran Tambahan:</strong></p>
-    <ul>
-        <li>Lakukan monitoring berkala terhadap pergerakan harga saham</li>
-        <li>Pertimbangkan untuk menetapkan stop-loss sesuai dengan toleransi risiko Anda</li>
-        <li>Diversifikasi portofolio untuk mengurangi risiko konsentrasi</li>
-        <li>{'Pertimbangkan metode hedging untuk melindungi nilai investasi dari fluktuasi ekstrem' if risk_level == 'TINGGI' else 'Tetap waspada terhadap kondisi pasar yang dapat mempengaruhi nilai investasi'}</li>
-    </ul>
+<h4>🎯 Tingkat Risiko: {risk_level}</h4>
+<p><strong>Potensi Kerugian Maksimal:</strong> Rp {max_loss:,.0f} ({max_loss_pct:.2f}% dari investasi)</p>
+<p><strong>Rekomendasi:</strong> {recommendation}</p>
+<hr style="margin-top:10px;margin-bottom:10px;">
+<p><strong>Saran Tambahan:</strong></p>
+<ul>
+    <li>Lakukan monitoring berkala terhadap pergerakan harga saham</li>
+    <li>Pertimbangkan untuk menetapkan stop-loss sesuai dengan toleransi risiko Anda</li>
+    <li>Diversifikasi portofolio untuk mengurangi risiko konsentrasi</li>
+    <li>{'Pertimbangkan metode hedging untuk melindungi nilai investasi dari fluktuasi ekstrem' if risk_level == 'TINGGI' else 'Tetap waspada terhadap kondisi pasar yang dapat mempengaruhi nilai investasi'}</li>
+</ul>
 </div>
 """, unsafe_allow_html=True)
 
-                # Download Excel
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    df_results.to_excel(writer, index=False, sheet_name='VaR Results')
-                    
-                    # Tambahkan sheet statistik
-                    stats_data = {
-                        'Statistik': ['Mean', 'Std Dev', 'Skewness', 'Kurtosis', 'Min', 'Max', 'Count'],
-                        'Nilai': [mean_return, std_return, skewness, kurtosis, 
-                                 log_returns.min(), log_returns.max(), len(log_returns)]
-                    }
-                    pd.DataFrame(stats_data).to_excel(writer, index=False, sheet_name='Statistik')
-
-                st.download_button(
-                    label="💾 Download Hasil VaR ke Excel",
-                    data=output.getvalue(),
-                    file_name="var_results_complete.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    use_container_width=True
-                )
+            # Download hasil (Excel/Parquet/CSV), dibuat saat tombol diklik
+            export_sheets = {'VaR Results': df_results, 'Tail Quantiles': df_ladder}
+            if tail_histograms is not None:
+                export_sheets['Tail Histogram'] = pd.DataFrame([
+                    {'Holding Period': f"{hp} hari", 'Batas Bawah': edges[k], 'Batas Atas': edges[k + 1],
+                     'Frekuensi': counts[k]}
+                    for hp, (counts, edges) in zip(holding_periods, tail_histograms)
+                    for k in range(len(counts))
+                ])
+            # Tambahkan sheet statistik
+            export_sheets['Statistik'] = pd.DataFrame({
+                'Statistik': ['Mean', 'Std Dev', 'Skewness', 'Kurtosis', 'Min', 'Max', 'Count'],
+                'Nilai': [mean_return, std_return, skewness, kurtosis,
+                          log_returns.min(), log_returns.max(), len(log_returns)]
+            })
+            download_buttons(export_sheets, "var_results_complete", key="var_download",
+                             label="💾 Download Hasil VaR")
+
+        st.markdown("---")
+        st.subheader("📜 VaR Historis & Skenario Stres")
+        st.markdown("""
+        <div class="info-box">
+            VaR historis dan kerugian terburuk dihitung dari seluruh jendela h hari pada data historis
+            (return kumulatif dari prefix sum log return), tanpa asumsi distribusi. Indeks disimpan per data,
+            sehingga mengganti holding period atau nilai posisi langsung memperbarui hasil.
+        </div>
+        """, unsafe_allow_html=True)
+
+        # Tanggal diambil dari kolom tanggal file upload agar skenario krisis bisa dipetakan
+        uploaded_data = st.session_state.get('uploaded_data')
+        date_col = find_column(list(uploaded_data.columns), DATE_COLUMN_NAMES) if uploaded_data is not None else None
+        history = log_returns
+        if not isinstance(history.index, pd.DatetimeIndex) and date_col is not None and uploaded_data[date_col].notna().all():
+            history = pd.Series(log_returns.values, index=pd.DatetimeIndex(uploaded_data.loc[log_returns.index, date_col]))
+        hist_index = get_historical_index(history)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            hist_hp_text = st.text_input("Holding Period Historis (hari, pisahkan dengan koma)", value="1,5,20",
+                                         key="hist_hp")
+            try:
+                hist_holding_periods = sorted({int(x.strip()) for x in hist_hp_text.split(',') if x.strip()})
+            except ValueError:
+                st.error("Format holding period tidak valid! Gunakan format: 1,5,20")
+                hist_holding_periods = [1, 5, 20]
+            if any(hp < 1 for hp in hist_holding_periods):
+                st.warning("⚠️ Holding period kurang dari 1 hari diabaikan")
+                hist_holding_periods = [hp for hp in hist_holding_periods if hp >= 1]
+            if not hist_holding_periods:
+                st.error("Holding period historis kosong! Menggunakan default: 1,5,20")
+                hist_holding_periods = [1, 5, 20]
+        with col2:
+            hist_v0 = st.number_input("Nilai Posisi (V0) dalam Rupiah", min_value=100000,
+                                      max_value=9007199254740991, value=100000000, step=1000000,
+                                      format="%d", key="hist_v0")
+
+        with perf.stage('historical_var', holding_periods=len(hist_holding_periods)):
+            hist_alphas = [0.01, 0.05, 0.10]
+            hist_var = hist_index.historical_var(hist_alphas, hist_holding_periods)
+        st.dataframe(pd.DataFrame([
+            {'Confidence Level': f"{int((1-alpha)*100)}%", 'Holding Period': f"{hp} hari",
+             'VaR Historis': hist_var[i, j], 'Kerugian Maksimal (Rp)': f"Rp {abs(hist_var[i, j] * hist_v0):,.0f}"}
+            for i, alpha in enumerate(hist_alphas) for j, hp in enumerate(hist_holding_periods)
+        ]), use_container_width=True, hide_index=True)
+
+        worst_hp = st.selectbox("Jendela Terburuk untuk Holding Period", hist_holding_periods,
+                                format_func=lambda hp: f"{hp} hari", key="hist_worst_hp")
+        df_worst = hist_index.worst_windows(worst_hp, count=10)
+        df_worst['Kerugian (Rp)'] = (df_worst['Return Kumulatif'] * hist_v0).abs()
+        st.dataframe(df_worst, use_container_width=True, hide_index=True)
+
+        if hist_index.dates is not None:
+            df_stress = hist_index.stress_table(hist_v0)
+            if df_stress.empty:
+                st.info("ℹ️ Periode data tidak mencakup skenario krisis yang tersedia")
+            else:
+                st.write("**Skenario Krisis Historis:**")
+                st.dataframe(df_stress, use_container_width=True, hide_index=True)
+                partial = df_stress.loc[~df_stress['Cakupan Penuh'], 'Skenario']
+                if not partial.empty:
+                    st.warning("⚠️ Data hanya mencakup sebagian jendela skenario berikut, sehingga kerugiannya "
+                               "bisa lebih kecil dari skenario penuh: " + ", ".join(partial))
+        else:
+            st.info("ℹ️ Skenario krisis bernama membutuhkan kolom tanggal (Date) pada file yang diupload")
+
+        if 'batch_log_returns' in st.session_state:
+            st.write("**VaR Historis 99% per Saham (Daftar Preset):**")
+            batch_indexes = get_historical_indexes(st.session_state['batch_log_returns'])
+            st.dataframe(pd.DataFrame(
+                {f"{hp} hari": [batch_index.historical_var([0.01], [hp])[0, 0] for batch_index in batch_indexes.values()]
+                 for hp in hist_holding_periods},
+                index=list(batch_indexes)
+            ), use_container_width=True)
+
+        st.markdown("---")
+        st.subheader("🧪 Backtesting VaR (Rolling Window)")
+        st.markdown("""
+        <div class="info-box">
+            VaR 1 hari dihitung ulang dari window data sebelumnya untuk setiap tanggal, lalu dibandingkan
+            dengan return realisasi. Uji <strong>Kupiec (POF)</strong> menguji jumlah pelanggaran, uji
+            <strong>Christoffersen</strong> menguji apakah pelanggaran saling independen.
+        </div>
+        """, unsafe_allow_html=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            backtest_window = st.number_input("Panjang Window (hari)", min_value=30,
+                                              max_value=max(30, len(log_returns) - 1),
+                                              value=min(250, max(30, len(log_returns) // 2)), step=10)
+        with col2:
+            backtest_method = st.radio("Metode VaR", ["Cornish-Fisher", "Monte Carlo (Normal)"], horizontal=True,
+                                       index=0 if not is_normal else 1)
+
+        if st.button("🧪 Jalankan Backtest", use_container_width=True):
+            try:
+                with st.spinner('Menjalankan backtest...'):
+                    with perf.stage('backtest', window=backtest_window, method=backtest_method):
+                        backtest_daily, backtest_summary = backtest_var(
+                            log_returns, window=backtest_window,
+                            method='cornish_fisher' if backtest_method == "Cornish-Fisher" else 'monte_carlo'
+                        )
+                st.dataframe(backtest_summary, use_container_width=True)
+                st.line_chart(backtest_daily[[col for col in backtest_daily.columns
+                                              if not col.startswith('Exceed')]])
+            except ValueError as e:
+                st.error(f"❌ {str(e)}")
+
+    if 'batch_log_returns' in st.session_state:
+        st.markdown("---")
+        st.subheader("💼 VaR Portofolio (Monte Carlo Multivariat)")
+
+        batch_returns = st.session_state['batch_log_returns']
+        st.markdown(f"""
+        <div class="info-box">
+            <strong>📊 Metode:</strong> Monte Carlo Normal multivariat dengan matriks kovarians log return
+            {batch_returns.shape[1]} saham hasil download daftar preset di Tab 1.
+        </div>
+        """, unsafe_allow_html=True)
+
+        weights_df = st.data_editor(
+            pd.DataFrame({'Ticker': batch_returns.columns, 'Bobot': 1 / batch_returns.shape[1]}),
+            disabled=['Ticker'], hide_index=True, use_container_width=True
+        )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            pf_v0 = st.number_input("Nilai Portofolio (V0) dalam Rupiah",
+                                    min_value=100000, max_value=9007199254740991,
+                                    value=100000000, step=1000000, format="%d", key="pf_v0")
+        with col2:
+            pf_iterations = st.number_input("Jumlah Iterasi Monte Carlo Portofolio",
+                                            min_value=100, max_value=10000000,
+                                            value=100000, step=10000, key="pf_iterations")
+
+        if st.button("🚀 Hitung VaR Portofolio", type="primary", use_container_width=True):
+            with st.spinner('Menghitung VaR portofolio...'):
+                pf_alphas = [0.01, 0.05, 0.10]
+                pf_holding_periods = [1, 5, 20]
+                with perf.stage('portfolio_var', assets=batch_returns.shape[1], iterations=pf_iterations):
+                    pf_var, pf_component, pf_marginal = portfolio_var(
+                        batch_returns.values, weights_df['Bobot'].values,
+                        pf_alphas, pf_holding_periods, pf_iterations
+                    )
+
+                pf_results = []
+                pf_components = {}
+                pf_marginals = {}
+                for i, alpha in enumerate(pf_alphas):
+                    for j, hp in enumerate(pf_holding_periods):
+                        pf_results.append({
+                            'Confidence Level': f"{int((1-alpha)*100)}%",
+                            'Holding Period': f"{hp} hari",
+                            'VaR Value': pf_var[i, j],
+                            'Kerugian Maksimal (Rp)': abs(pf_var[i, j] * pf_v0)
+                        })
+                        pf_components[f"{int((1-alpha)*100)}% / {hp} hari"] = pf_component[i, j]
+                        pf_marginals[f"{int((1-alpha)*100)}% / {hp} hari"] = pf_marginal[i, j]
+
+                st.subheader("📊 Hasil VaR Portofolio")
+                st.dataframe(pd.DataFrame(pf_results), use_container_width=True)
+
+                st.subheader("🧩 Component & Marginal VaR per Saham")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write("**Component VaR** (kontribusi terhadap VaR portofolio)")
+                    st.dataframe(pd.DataFrame(pf_components, index=batch_returns.columns),
+                                 use_container_width=True)
+                with col2:
+                    st.write("**Marginal VaR** (perubahan VaR per unit bobot)")
+                    st.dataframe(pd.DataFrame(pf_marginals, index=batch_returns.columns),
+                                 use_container_width=True)
+
+# PANEL PERFORMANCE
+if perf.enabled:
+    for source, recorder in deferred_perf.items():
+        perf.merge(recorder, source=source)
+    with st.expander("⏱️ Performance", expanded=False):
+        if perf.records:
+            df_perf = pd.DataFrame(perf.records)
+            df_perf['stage'] = ['  ' * depth + stage for depth, stage in zip(df_perf['depth'], df_perf['stage'])]
+            if 'peak_bytes' in df_perf:
+                df_perf['peak_mb'] = df_perf.pop('peak_bytes') / 2**20
+            st.dataframe(df_perf.drop(columns='depth'), use_container_width=True, hide_index=True)
+            total_seconds = sum(record['seconds'] for record in perf.records if record['depth'] == 0)
+            st.caption(f"Total {total_seconds:.3f} s untuk tahap terluar pada eksekusi ini (sesi {session_id})")
+            for stage_name, profile_text in perf.profiles.items():
+                st.markdown(f"**cProfile – {stage_name}**")
+                st.code(profile_text, language=None)
+        else:
+            st.caption("Belum ada tahap yang diukur pada eksekusi ini; jalankan salah satu proses di tab di atas.")
+        show_session_memory()
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from investa.historical import HistoricalIndex
+
+SCENARIOS = {'Penuh': ('2020-02-03', '2020-02-28'), 'Sebagian': ('2020-03-16', '2020-04-30')}
+
+
+def make_index():
+    dates = pd.bdate_range('2020-01-01', '2020-03-31')
+    return HistoricalIndex(pd.Series(np.random.default_rng(0).normal(0, 0.01, len(dates)), index=dates))
+
+
+def test_scenario_reports_partial_coverage():
+    index = make_index()
+    full = index.scenario(*SCENARIOS['Penuh'])
+    assert full['Cakupan Penuh']
+    partial = index.scenario(*SCENARIOS['Sebagian'])
+    assert not partial['Cakupan Penuh']
+    assert partial['Akhir'] == pd.Timestamp('2020-03-31')
+    assert partial['Akhir Diminta'] == pd.Timestamp('2020-04-30')
+    # Data yang berawal setelah jendela dimulai juga tidak tercakup penuh
+    assert not index.scenario('2019-12-01', '2020-01-15')['Cakupan Penuh']
+    assert index.scenario('2021-01-01', '2021-02-01') is None
+
+
+def test_stress_table_flags_partial_scenarios():
+    table = make_index().stress_table(1e6, SCENARIOS)
+    assert table.set_index('Skenario')['Cakupan Penuh'].to_dict() == {'Penuh': True, 'Sebagian': False}
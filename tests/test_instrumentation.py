@@ -0,0 +1,21 @@
+from investa.instrumentation import PerfRecorder
+
+
+def test_merge_moves_finished_records():
+    session, job = PerfRecorder(enabled=True), PerfRecorder(enabled=True)
+    with job.stage('simulation', iterations=10):
+        with job.stage('chunk'):
+            pass
+    session.merge(job, source='var_job')
+    assert [(record['stage'], record['depth'], record['source']) for record in session.records] == [
+        ('simulation', 0, 'var_job'), ('chunk', 1, 'var_job')]
+    assert job.records == []
+
+
+def test_merge_waits_for_running_stage():
+    session, job = PerfRecorder(enabled=True), PerfRecorder(enabled=True)
+    with job.stage('simulation'):
+        session.merge(job)
+        assert session.records == []
+    session.merge(job)
+    assert [record['stage'] for record in session.records] == ['simulation']
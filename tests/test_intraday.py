@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from investa.intraday import IntradayStore
+from investa.prices import DownloadError
+
+NOW = datetime(2024, 7, 1, 12, 0)
+
+
+def make_bars(start, end, scale=1.0):
+    days = pd.bdate_range(start, end, inclusive='left')
+    index = (days.repeat(7) + pd.to_timedelta(np.tile(np.arange(9, 16), len(days)), 'h'))
+    index = index[(index >= pd.Timestamp(start)) & (index < pd.Timestamp(end))]
+    close = scale * (100 + (index - pd.Timestamp('2024-01-01')).total_seconds().to_numpy() / 3600)
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1.0}, index=index)
+
+
+class FakeDownloader:
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+        self.scale = 1.0
+
+    def __call__(self, ticker, start, end, interval):
+        self.calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+        if self.fail:
+            raise DownloadError("rate limited")
+        return make_bars(start, end, self.scale)
+
+
+@pytest.fixture
+def downloader():
+    return FakeDownloader()
+
+
+@pytest.fixture
+def store(tmp_path, downloader):
+    return IntradayStore(str(tmp_path), downloader=downloader, now=lambda: NOW)
+
+
+def stored(store, start, end):
+    return pd.concat(store.iter_chunks('BBCA.JK', start, end, '1h'))
+
+
+def test_only_missing_months_are_downloaded(store, downloader):
+    store.ingest('BBCA.JK', '2024-01-01', '2024-03-01', '1h')
+    downloader.calls.clear()
+    store.ingest('BBCA.JK', '2024-01-01', '2024-03-01', '1h')
+    assert downloader.calls == []
+    store.ingest('BBCA.JK', '2024-01-01', '2024-04-01', '1h')
+    assert downloader.calls and all(start >= pd.Timestamp('2024-03-01') for start, _ in downloader.calls)
+    assert len(stored(store, '2024-01-01', '2024-04-01')) == len(make_bars('2024-01-01', '2024-04-01'))
+
+
+def test_failed_download_does_not_extend_coverage(store, downloader):
+    store.ingest('BBCA.JK', '2024-01-01', '2024-02-01', '1h')
+    coverage = store._load_coverage('BBCA.JK', '1h')
+    downloader.fail = True
+    with pytest.raises(DownloadError):
+        store.ingest('BBCA.JK', '2024-01-01', '2024-03-01', '1h')
+    assert store._load_coverage('BBCA.JK', '1h') == coverage
+    downloader.fail = False
+    store.ingest('BBCA.JK', '2024-01-01', '2024-03-01', '1h')
+    assert len(stored(store, '2024-01-01', '2024-03-01')) == len(make_bars('2024-01-01', '2024-03-01'))
+
+
+def test_new_adjustment_reloads_cached_bars(store, downloader):
+    store.ingest('BBCA.JK', '2024-06-01', '2024-06-20', '1h')
+    # Dividen baru: seluruh bar disesuaikan ulang
+    downloader.scale = 0.5
+    store.ingest('BBCA.JK', '2024-06-01', '2024-06-28', '1h')
+    expected = make_bars('2024-06-01', '2024-06-28', scale=0.5)
+    np.testing.assert_allclose(stored(store, '2024-06-01', '2024-06-28')['Close'].to_numpy(),
+                               expected['Close'].to_numpy())
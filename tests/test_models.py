@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+from scipy import optimize
+
+from investa import models
+from investa.models import GarchModel, fit_garch
+
+RETURNS = np.random.default_rng(2).normal(0.0005, 0.02, 500)
+
+
+def test_fit_garch_returns_stationary_model():
+    model = fit_garch(RETURNS)
+    assert isinstance(model, GarchModel)
+    assert model.alpha + model.beta < 1
+
+
+def test_fit_garch_raises_when_optimizer_fails(monkeypatch):
+    def failed(fun, x0, **kwargs):
+        return optimize.OptimizeResult(x=np.asarray(x0), success=False, message="Iteration limit reached")
+
+    monkeypatch.setattr(models.optimize, 'minimize', failed)
+    with pytest.raises(ValueError, match="tidak konvergen"):
+        fit_garch(RETURNS)
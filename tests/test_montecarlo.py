@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from investa.models import BootstrapModel
+from investa.montecarlo import NormalModel, parametric_var, simulate_risk
+
+ALPHAS = [0.01, 0.05, 0.25]
+HOLDING_PERIODS = [1, 5, 20]
+LADDER = (0.001, 0.01, 0.1)
+
+
+@pytest.mark.parametrize('model', [
+    NormalModel(0.0005, 0.02, 'collapsed'),
+    NormalModel(0.0005, 0.02, 'qmc'),
+    # Nilai kembar (distribusi diskret) menguji batas bin sketsa
+    BootstrapModel(np.round(np.random.default_rng(1).normal(0, 0.02, 250), 4)),
+], ids=['collapsed', 'qmc', 'bootstrap'])
+def test_sketch_matches_exact_tail_buffer(model):
+    kwargs = dict(seed=3, chunk_size=20000, ladder=LADDER, bins=20)
+    exact = simulate_risk(model, ALPHAS, HOLDING_PERIODS, 200000, **kwargs)
+    # tail_bytes=0 memaksa TailSketch dua lintasan
+    sketch = simulate_risk(model, ALPHAS, HOLDING_PERIODS, 200000, tail_bytes=0, **kwargs)
+    for key in ('var', 'stderr', 'ladder'):
+        np.testing.assert_array_equal(sketch[key], exact[key])
+    np.testing.assert_allclose(sketch['es'], exact['es'], rtol=1e-12)
+    for (sketch_counts, sketch_edges), (counts, edges) in zip(sketch['histogram'], exact['histogram']):
+        np.testing.assert_array_equal(sketch_edges, edges)
+        np.testing.assert_array_equal(sketch_counts, counts)
+
+
+@pytest.mark.parametrize('tail_bytes', [None, 0], ids=['exact', 'sketch'])
+def test_normal_simulation_matches_parametric_var(tail_bytes):
+    mean, std, iterations = 0.0005, 0.02, 400000
+    kwargs = {} if tail_bytes is None else {'tail_bytes': tail_bytes}
+    result = simulate_risk(NormalModel(mean, std, 'collapsed'), ALPHAS, HOLDING_PERIODS, iterations, seed=5,
+                           **kwargs)
+    expected = parametric_var(mean, std, ALPHAS, HOLDING_PERIODS)
+    # Dalam 4 standard error order statistic
+    assert np.all(np.abs(result['var'] - expected) <= 4 * result['stderr'])
+
+
+@pytest.mark.parametrize('sampler', ['paths', 'qmc'])
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+@pytest.mark.parametrize('tail_bytes', [None, 0], ids=['exact', 'sketch'])
+def test_results_do_not_depend_on_worker_count(sampler, executor, tail_bytes):
+    kwargs = dict(seed=11, chunk_size=5000, ladder=LADDER, bins=20)
+    if tail_bytes is not None:
+        kwargs['tail_bytes'] = tail_bytes
+    model = NormalModel(0.0005, 0.02, sampler)
+    single = simulate_risk(model, ALPHAS, HOLDING_PERIODS, 50000, workers=1, **kwargs)
+    parallel = simulate_risk(model, ALPHAS, HOLDING_PERIODS, 50000, workers=3, executor=executor, **kwargs)
+    for key in ('var', 'es', 'stderr', 'ladder'):
+        np.testing.assert_array_equal(parallel[key], single[key])
+    for (parallel_counts, parallel_edges), (counts, edges) in zip(parallel['histogram'], single['histogram']):
+        np.testing.assert_array_equal(parallel_edges, edges)
+        np.testing.assert_array_equal(parallel_counts, counts)
@@ -0,0 +1,18 @@
+import numpy as np
+
+from investa.portfolio import portfolio_var
+
+
+def test_components_sum_to_portfolio_var():
+    returns = np.random.default_rng(0).normal(0, 0.01, (500, 3))
+    var, component, marginal = portfolio_var(returns, [0.5, 0.3, 0.2], [0.01, 0.05], [1, 5], 20000, seed=1)
+    np.testing.assert_allclose(component.sum(axis=-1), var)
+    np.testing.assert_allclose(marginal * [0.5, 0.3, 0.2], component)
+
+
+def test_offsetting_weights_give_finite_components():
+    # Dua aset identik dengan posisi long/short yang saling meniadakan: jumlah kontribusi nol
+    asset = np.random.default_rng(0).normal(0, 0.01, 500)
+    var, component, marginal = portfolio_var(np.column_stack([asset, asset]), [1.0, -1.0], [0.05], [1, 5], 5000,
+                                             seed=1)
+    assert np.all(np.isfinite(var)) and np.all(np.isfinite(component)) and np.all(np.isfinite(marginal))
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from investa.prices import DownloadError, PriceStore
+
+NOW = datetime(2024, 7, 1, 12, 0)
+
+
+def make_bars(start, end, scale=1.0):
+    index = pd.bdate_range(start, end, inclusive='left')
+    close = scale * (100 + (index - pd.Timestamp('2024-01-01')).days.to_numpy(dtype=float))
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1.0}, index=index)
+
+
+class FakeDownloader:
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+        self.scale = 1.0
+
+    def __call__(self, ticker, start, end):
+        self.calls.append((start, end))
+        if self.fail:
+            raise DownloadError("rate limited")
+        return make_bars(start, end, self.scale)
+
+
+@pytest.fixture
+def downloader():
+    return FakeDownloader()
+
+
+@pytest.fixture
+def store(downloader):
+    return PriceStore(':memory:', downloader=downloader, now=lambda: NOW)
+
+
+def test_only_missing_ranges_are_downloaded(store, downloader):
+    assert len(store.get('BBCA.JK', '2024-01-01', '2024-03-01')) == 44
+    downloader.calls.clear()
+    assert len(store.get('BBCA.JK', '2024-01-01', '2024-03-01')) == 44
+    assert downloader.calls == []
+
+
+def test_failed_download_does_not_extend_coverage(store, downloader):
+    store.get('BBCA.JK', '2024-01-01', '2024-03-01')
+    downloader.fail = True
+    with pytest.raises(DownloadError):
+        store.get('BBCA.JK', '2024-01-01', '2024-06-01')
+    downloader.fail = False
+    assert len(store.get('BBCA.JK', '2024-01-01', '2024-06-01')) == len(make_bars('2024-01-01', '2024-06-01'))
+
+
+def test_get_many_reports_failed_ticker_as_empty(store, downloader):
+    downloader.fail = True
+    frames = store.get_many(['BBCA.JK'], '2024-01-01', '2024-03-01')
+    assert frames['BBCA.JK'].empty
+    downloader.fail = False
+    assert not store.get('BBCA.JK', '2024-01-01', '2024-03-01').empty
+
+
+def test_new_adjustment_reloads_cached_history(store, downloader):
+    store.get('BBCA.JK', '2024-01-01', '2024-03-01')
+    # Dividen baru: seluruh riwayat harga disesuaikan ulang
+    downloader.scale = 0.5
+    data = store.get('BBCA.JK', '2024-01-01', '2024-04-01')
+    expected = make_bars('2024-01-01', '2024-04-01', scale=0.5)
+    np.testing.assert_allclose(data['Close'].to_numpy(), expected['Close'].to_numpy())